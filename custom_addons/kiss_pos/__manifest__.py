@@ -2,11 +2,12 @@
     'name': 'Kiss POS',
     'version': '1.0',
     'category': 'Website',
-    'depends': ['base', 'product', 'web', 'point_of_sale'],
+    'depends': ['base', 'product', 'web', 'point_of_sale', 'product_data_feed_brand'],
     'license': 'LGPL-3',
     'data': [
         'views/template.xml',
         'security/ir.model.access.csv',
+        'data/ir_cron.xml',
     ],
     'assets': {
         'web.assets_frontend': [
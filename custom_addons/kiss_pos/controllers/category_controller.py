@@ -3,6 +3,7 @@ from odoo.http import request
 import json
 import logging
 import time
+from .utils import compute_etag, etag_matches, etag_headers, not_modified_response
 
 _logger = logging.getLogger(__name__)
 
@@ -20,7 +21,13 @@ class CategoryController(http.Controller):
     def api_category_list(self, **kw):
         _logger.info("API request received for category list.")
         try:
-            categories = request.env['product.category'].search([])
+            Category = request.env['product.category']
+            # Creator/modifier names live on the users' partners
+            etag = compute_etag(Category, [], ['res.partner'])
+            if etag_matches(etag):
+                return not_modified_response(etag)
+
+            categories = Category.search([])
             all_categories = [{
                 "id": c.id,
                 "name": c.name,
@@ -35,7 +42,7 @@ class CategoryController(http.Controller):
 
             return request.make_response(
                 json.dumps({'categories': all_categories}),
-                headers=[('Content-Type', 'application/json')]
+                headers=[('Content-Type', 'application/json')] + etag_headers(etag)
             )
         except Exception as e:
             _logger.error(f"Error fetching categories: {str(e)}")
@@ -99,6 +99,7 @@ class FilterController(http.Controller):
                     "username": filter_record.user_id.name,
                     "filter_parameters": filter_parameters,
                     "active": filter_record.active,
+                    "last_result_count": filter_record.last_result_count,
                     "created_date": filter_record.create_date.strftime('%m/%d/%y') if filter_record.create_date else None,
                     "modified_date": filter_record.write_date.strftime('%m/%d/%y') if filter_record.write_date else None,
                 })
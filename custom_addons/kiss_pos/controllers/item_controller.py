@@ -1,14 +1,109 @@
-from odoo import http
-from odoo.http import request
+from odoo import api, http
+from odoo.exceptions import ConcurrencyError
+from odoo.http import content_disposition, request, Response
+from odoo.modules.registry import Registry
+from .utils import (
+    compute_etag, etag_matches, etag_headers, not_modified_response, parse_list_format, to_columnar, encode_payload,
+)
+from ..models.item import ITEM_LIST_COLUMNS, ITEM_LIST_ORDERS
+from ..models.item_list_cache import item_list_cache
+from ..models.item_tombstone import TOMBSTONE_RETENTION_DAYS
+from datetime import datetime, timedelta
+import base64
+import binascii
+import csv
+import io
 import json
 import logging
-import time
+import tempfile
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
 
 _logger = logging.getLogger(__name__)
 
 # Valid status values
 VALID_STATUSES = ["Not Confirmed", "Active", "Inactive", "Discontinued"]
 
+# product.template field -> posted item key of /api/add_items and /api/upsert_items
+ITEM_POSTED_KEYS = {
+    'name': 'item_name',
+    'barcode': 'barcode',
+    'default_code': 'sku',
+    'list_price': 'selling_price',
+    'standard_price': 'cost',
+    'item_status': 'status',
+    'msrp': 'msrp',
+    'volume': 'volume',
+    'weight': 'weight',
+    'color_name': 'color',
+    'feed_brand_id': 'brand',
+    'on_hand': 'on_hand',
+    'age_restriction': 'age_restriction',
+    'use_ebt': 'use_ebt',
+    'item_unit': 'item_unit',
+    'item_type': 'item_type',
+    'tax_code': 'tax_code',
+    'packaging_type': 'packaging_type',
+    'srs_category': 'srs_category',
+    'inventory_tracking': 'inventory_tracking',
+    'in_transit': 'in_transit',
+    'reorder_point': 'reorder_point',
+    'restock_level': 'restock_level',
+    'min_order_qty': 'min_order_qty',
+    'size': 'size',
+    'dimension': 'dimension',
+    'company_id': 'company_id',
+    'parent_company_id': 'parent_company_id',
+    'categ_id': 'categ_id',
+    'vendor1_id': 'vendor1_id',
+    'vendor2_id': 'vendor2_id',
+}
+
+# Upper bound for a single page of the item list API
+ITEM_LIST_MAX_LIMIT = 1000
+
+# Default number of results of the ranked item search
+ITEM_SEARCH_DEFAULT_LIMIT = 20
+
+# Item list keys whose repeating values are dictionary encoded in the columnar formats
+ITEM_LIST_DICTIONARY_COLUMNS = {
+    'category', 'company', 'supplier', 'secondary_supplier', 'status', 'created_by', 'created_date',
+    'modified_by', 'modified_date', 'parent_company', 'brand', 'item_type', 'item_unit', 'tax_code',
+    'packaging_type', 'srs_category', 'color', 'size',
+}
+
+# Filter panel facets: response key -> product.template fields counted
+ITEM_FACETS = {
+    'brands': ['feed_brand_id'],
+    'categories': ['categ_id'],
+    'item_unit': ['item_unit'],
+    'item_type': ['type'],
+    'suppliers': ['vendor1_id', 'vendor2_id'],
+    'tax_codes': ['tax_code'],
+}
+
+# write_date is the start of the writing transaction, which may commit
+# after a sync token later than it was issued, so each delta sync re-reads
+# this window. It covers the longest transactions of the workers (the
+# limit_time_real of HTTP and cron workers, 120 seconds by default) with
+# margin, like the overlap of the barcode indexes.
+ITEM_SYNC_OVERLAP = timedelta(minutes=5)
+
+# Default number of records serialized per chunk when streaming the item list
+ITEM_STREAM_BATCH_SIZE = 500
+
+# Item export formats -> (content type, file name)
+ITEM_EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'export.csv'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'export.xlsx'),
+}
+
+# Number of records serialized per batch of an item export
+ITEM_EXPORT_BATCH_SIZE = 1000
+
 class ItemController(http.Controller):
 
     @http.route('/item_list', type='http', auth='public', website=True)
@@ -29,265 +124,531 @@ class ItemController(http.Controller):
     
     @http.route('/api/item_list', type='http', auth='public', csrf=False)
     def api_item_list(self, **kw):
+        """
+        Return the items matching the posted filters.
+
+        Without ``limit`` the whole filtered catalog is returned.
+        With ``limit`` only one page is returned together with a
+        ``next_cursor`` to pass back as ``cursor`` for the following page
+        (``null`` on the last page). ``with_count=1`` adds the total number
+        of matching items to the response, and ``fields`` (comma separated
+        item keys) restricts both the columns read and the keys returned.
+
+        ``order`` sorts by one of the ITEM_LIST_ORDERS keys, e.g.
+        ``unit_price asc`` or ``modified_date desc`` (id desc by default),
+        in the database and consistently across pages.
+
+        ``ranked=1`` matches ``search`` against the full-text item document
+        (name, codes, brand, category, color) and returns the best matches
+        first instead of a substring match ordered by id.
+
+        ``format=columnar`` returns ``items`` as column arrays with
+        dictionary-encoded repeating strings and numeric prices;
+        ``format=msgpack`` sends the same structure as MessagePack when the
+        library is installed.
+
+        ``stream=1`` returns the whole filtered catalog as a chunked JSON
+        response written ``batch_size`` records at a time, for exports and
+        offline caches that need every item without holding them in memory.
+        Streams are always row-oriented JSON.
+
+        Non-ranked pages are read from the kiss_pos.item_list_row read model
+        (unless the ``kiss_pos.item_list_read_model`` parameter is false),
+        which holds the serialized grid rows.
+
+        Responses carry an ETag; a matching ``If-None-Match`` gets an empty
+        304 without any item being read. Non-streamed payloads are kept in
+        the per-worker item list cache for as long as that ETag holds.
+        """
         _logger.info("API request received for item list.")
         
         search_query = kw.get('search', '')
         _logger.info(f"Search Query: {search_query} (type: {type(search_query)})")
         
-        filters = json.loads(request.httprequest.data)
+        filters = json.loads(request.httprequest.data or '{}')
         _logger.info(f"Filters -> {filters}")
         
         try:
-            domain = []
-            
-            # Filter by name search query
-            if search_query and search_query.strip():
-                _logger.info(f"Entered If Search query: {search_query.strip()}")
-                domain.append(('name', 'ilike', search_query.strip()))
-            
-            # Filter by price range
-            price_range = filters.get('price_range')
-            if price_range:
-                if 'min_price' in price_range:
-                    domain.append(('list_price', '>=', float(price_range['min_price'])))
-                if 'max_price' in price_range:
-                    domain.append(('list_price', '<=', float(price_range['max_price'])))
-
-            # Filter by brands
-            brands = filters.get('brands')
-            if brands:
-                domain.append(('feed_brand_id', 'in', brands))
-            
-            # Filter by item type
-            item_types = filters.get('item_type')
-            if item_types:
-                domain.append(('type', 'in', item_types))
-            
-            # Filter by item unit
-            item_units = filters.get('item_unit')
-            if item_units:
-                domain.append(('item_unit', 'in', item_units))
-            
-            # Filter by category
-            categories = filters.get('categories')
-            if categories:
-                domain.append(('categ_id', 'in', categories))
-            
-            # Filter by suppliers
-            suppliers = filters.get('suppliers')
-            if suppliers:
-                domain.append(('vendor1_id', 'in', suppliers))
-                domain.append(('vendor2_id', 'in', suppliers))
+            stream = kw.get('stream') in ('1', 'true', 'True')
+            # Ranked full-text search replaces the substring match when asked for
+            ranked = kw.get('ranked') in ('1', 'true', 'True') and bool(search_query.strip()) and not stream
+            Product = request.env['product.template'].sudo()
+            domain = Product._get_item_list_domain('' if ranked else search_query, filters)
+            return self._item_list_response(domain, kw, search_query.strip() if ranked else '')
+
+        except Exception as e:
+            _logger.error(f"Error occurred while fetching items: {str(e)}")
+            return request.make_response(
+                json.dumps({'error': 'Internal Server Error'}),
+                headers=[('Content-Type', 'application/json')],
+                status=500
+            )
+
+    @http.route('/api/filters/<int:filter_id>/items', type='http', auth='public', csrf=False)
+    def api_filter_items(self, filter_id, **kw):
+        """
+        Run a saved custom filter of the current user: the items matching its
+        compiled domain, with the same paging, order, ``fields``, ``format``
+        and ``stream`` parameters as /api/item_list. The number of matching
+        items is kept on the filter as its last result count.
+        """
+        try:
+            saved_filter = request.env['custom.filter'].sudo().search([
+                ('id', '=', filter_id),
+                ('user_id', '=', request.env.user.id),
+            ], limit=1)
+            if not saved_filter:
+                return request.make_response(
+                    json.dumps({'error': 'Filter not found'}),
+                    headers=[('Content-Type', 'application/json')],
+                    status=404
+                )
+
+            def update_count(count):
+                if count != saved_filter.last_result_count:
+                    saved_filter.write({'last_result_count': count})
+
+            return self._item_list_response(saved_filter._get_domain(), kw, on_count=update_count)
+
+        except Exception as e:
+            _logger.error(f"Error occurred while running filter {filter_id}: {str(e)}")
+            return request.make_response(
+                json.dumps({'error': 'Internal Server Error'}),
+                headers=[('Content-Type', 'application/json')],
+                status=500
+            )
+
+    def _item_list_response(self, domain, kw, ranked_query='', on_count=None):
+        """
+        Build the /api/item_list response for the items matching domain,
+        honouring the paging, order, projection, format, count and stream
+        parameters of kw. With ``ranked_query`` the items are ranked by
+        relevance to it instead. ``on_count`` is called with the number of
+        matching items unless the client gets a 304.
+        """
+        stream = kw.get('stream') in ('1', 'true', 'True')
+        limit = kw.get('limit')
+        try:
+            limit = min(int(limit), ITEM_LIST_MAX_LIMIT) if limit else None
+            if limit is not None and limit <= 0:
+                raise ValueError(limit)
+            order, descending = self._parse_order(kw.get('order'))
+            after = self._decode_cursor(kw.get('cursor'), order, descending) if kw.get('cursor') else None
+            fmt = parse_list_format(kw.get('format'))
+        except (ValueError, TypeError):
+            return request.make_response(
+                json.dumps({'error': 'Invalid limit, order, cursor or format'}),
+                headers=[('Content-Type', 'application/json')],
+                status=400
+            )
+
+        # Optional column projection, e.g. ?fields=name,barcode,unit_price
+        columns = [c.strip() for c in kw['fields'].split(',') if c.strip()] if kw.get('fields') else None
+
+        Product = request.env['product.template'].sudo()
+
+        with_count = kw.get('with_count') in ('1', 'true', 'True')
+        cache_key = json.dumps(
+            [self._normalize_domain(domain), ranked_query, order, descending, limit, after, columns,
+             with_count, stream, fmt, request.env.lang],
+            default=str
+        )
+
+        etag = compute_etag(Product, domain, Product._get_item_list_comodels(), cache_key)
+        if etag_matches(etag):
+            return not_modified_response(etag)
+
+        if stream:
+            if on_count:
+                on_count(Product.search_count(domain))
+            try:
+                batch_size = min(int(kw.get('batch_size') or ITEM_STREAM_BATCH_SIZE), ITEM_LIST_MAX_LIMIT)
+            except ValueError:
+                batch_size = ITEM_STREAM_BATCH_SIZE
+            return self._stream_item_list(domain, columns, max(batch_size, 1), etag)
+
+        content_type = 'application/x-msgpack' if fmt == 'msgpack' else 'application/json'
+        payload = item_list_cache.get(request.db, cache_key, etag)
+        if payload is not None:
+            if on_count:
+                on_count(Product.search_count(domain))
+            return request.make_response(
+                payload,
+                headers=[('Content-Type', content_type)] + etag_headers(etag)
+            )
+
+        # Plain listings are served from the flat read model when it can
+        # answer the domain, ranked searches need the template documents
+        ItemListRow = request.env['kiss_pos.item_list_row'].sudo()
+        source = ItemListRow if not ranked_query and ItemListRow._is_usable(domain) else Product
+
+        if ranked_query:
+            # Best matches first; relevance pages are not cursor based
+            items = Product.browse(Product._search_ranked(ranked_query, domain, limit))
+            has_more = False
+        else:
+            # Fetch one extra row to know whether another page follows
+            rows = source._search_keyset(domain, order, descending, after, limit + 1 if limit else None)
+            has_more = bool(limit) and len(rows) > limit
+            rows = rows[:limit] if limit else rows
+            items = source.browse([row[0] for row in rows])
             
-            # Filter by tax code
-            tax_codes = filters.get('tax_codes')
-            if tax_codes:
-                domain.append(('tax_code', 'in', tax_codes))
-                
-            items = request.env['product.template'].sudo().search(domain, order="id desc")
-                
-            _logger.info(f"Fetched {len(items)} items from the database.")
+        _logger.info(f"Fetched {len(items)} items from the database.")
 
-            all_items = []
-            for item in items:
-                # Generate image URLs for all available resolutions, but first check if images exist
-                timestamp = int(item.write_date.timestamp() * 1000) if item.write_date else int(time.time() * 1000)
-                
-                # Check if any image attachments exist for this product
-                attachments = request.env['ir.attachment'].sudo().search([
-                    ('res_model', '=', 'product.template'),
-                    ('res_id', '=', item.id),
-                    ('res_field', 'like', 'image_%')
-                ])
-                
-                # Create dictionary of available resolutions
-                image_urls = {}
-                if attachments:
-                    image_urls = {
-                        "image_1920": f'/web/image/product.template/{item.id}/image_1920?unique={timestamp}',
-                        "image_1024": f'/web/image/product.template/{item.id}/image_1024?unique={timestamp}',
-                        "image_512": f'/web/image/product.template/{item.id}/image_512?unique={timestamp}',
-                        "image_256": f'/web/image/product.template/{item.id}/image_256?unique={timestamp}',
-                        "image_128": f'/web/image/product.template/{item.id}/image_128?unique={timestamp}'
-                    }
-                
-                item_data = {
-                    "id": item.id,
-                    "name": item.name,
-                    "barcode": item.barcode or f"INV{item.id}",
-                    "sku": item.default_code or f"SKU1234567890{item.id}",
-                    "unit_price": f"${item.list_price:.2f}",
-                    "category": item.categ_id.name if item.categ_id else "Uncategorized",
-                    "company": item.company_id.name if item.company_id else "N/A",
-                    "supplier": item.vendor1_id.name if item.vendor1_id else "N/A",
-                    "status": item.item_status if item.item_status else "Not Confirmed",
-                    "created_by": item.create_uid.name if item.create_uid else None,
-                    "created_date": item.create_date.strftime('%m/%d/%y') if item.create_date else None,
-                    "modified_by": item.write_uid.name if item.write_uid else None,
-                    "modified_date": item.write_date.strftime('%m/%d/%y') if item.write_date else None,
-                    "parent_id": item.categ_id.id if item.categ_id else None,
-                    "cost": item.standard_price,
-                    "tax_code": item.tax_code if hasattr(item, 'tax_code') else None,
-                    "msrp": item.msrp if hasattr(item, 'msrp') else None,
-                    "parent_company": item.parent_company_id.name if hasattr(item, 'parent_company_id') and item.parent_company_id else None,
-                    "parent_company_id": item.parent_company_id.id if hasattr(item, 'parent_company_id') and item.parent_company_id else None,
-                    "brand": item.feed_brand_id.name if item.feed_brand_id else "N/A",
-                    "feed_brand_id": item.feed_brand_id.id if hasattr(item, 'feed_brand_id') and item.feed_brand_id else None,
-                    "on_hand": item.on_hand if hasattr(item, 'on_hand') else 0,
-                    "age_restriction": item.age_restriction if hasattr(item, 'age_restriction') else False,
-                    "use_ebt": item.use_ebt if hasattr(item, 'use_ebt') else False,
-                    "volume": item.volume,
-                    "weight": item.weight,
-                    "vendor1_id": item.vendor1_id.id if hasattr(item, 'vendor1_id') and item.vendor1_id else None,
-                    "vendor2_id": item.vendor2_id.id if hasattr(item, 'vendor2_id') and item.vendor2_id else None,
-                    "secondary_supplier": item.vendor2_id.name if hasattr(item, 'vendor2_id') and item.vendor2_id else None,
-                    "item_type": item.type,
-                    "item_unit": item.item_unit if hasattr(item, 'item_unit') else None,
-                    "packaging_type": item.packaging_type if hasattr(item, 'packaging_type') else None,
-                    "srs_category": item.srs_category if hasattr(item, 'srs_category') else None,
-                    "inventory_tracking": item.inventory_tracking if hasattr(item, 'inventory_tracking') else True,
-                    "in_transit": item.in_transit if hasattr(item, 'in_transit') else 0,
-                    "reorder_point": item.reorder_point if hasattr(item, 'reorder_point') else 0,
-                    "restock_level": item.restock_level if hasattr(item, 'restock_level') else 0,
-                    "min_order_qty": item.min_order_qty if hasattr(item, 'min_order_qty') else 0,
-                    "color": item.color_name,
-                    "size": item.size if hasattr(item, 'size') else None,
-                    "dimension": item.dimension if hasattr(item, 'dimension') else None,
-                    "image_urls": image_urls
+        all_items = items._get_item_list_data(columns, raw=fmt != 'json')
+        if fmt != 'json':
+            all_items = to_columnar(
+                all_items, Product._get_item_list_columns(columns), ITEM_LIST_DICTIONARY_COLUMNS
+            )
+
+        response_data = {'items': all_items}
+        if limit:
+            response_data['next_cursor'] = (
+                self._encode_cursor(order, descending, rows[-1][1], rows[-1][0]) if has_more else None
+            )
+        if with_count or on_count:
+            count = len(Product._search_ranked(ranked_query, domain)) if ranked_query else source.search_count(domain)
+            if with_count:
+                response_data['count'] = count
+            if on_count:
+                on_count(count)
+
+        payload, content_type = encode_payload(response_data, fmt)
+        item_list_cache.set(request.db, cache_key, etag, payload)
+
+        return request.make_response(
+            payload,
+            headers=[('Content-Type', content_type)] + etag_headers(etag)
+        )
+
+    @http.route('/api/item_search', type='http', auth='public', csrf=False)
+    def api_item_search(self, **kw):
+        """
+        Ranked item search across name, SKU, barcode, brand, category and
+        color. Takes ``q``, ``limit`` (default 20), ``fields`` and the item
+        list filters as an optional JSON body.
+        """
+        try:
+            query = kw.get('q', '')
+            try:
+                limit = min(int(kw.get('limit') or ITEM_SEARCH_DEFAULT_LIMIT), ITEM_LIST_MAX_LIMIT)
+            except ValueError:
+                limit = ITEM_SEARCH_DEFAULT_LIMIT
+            filters = json.loads(request.httprequest.data or '{}')
+            columns = [c.strip() for c in kw['fields'].split(',') if c.strip()] if kw.get('fields') else None
+
+            Product = request.env['product.template'].sudo()
+            domain = Product._get_item_list_domain('', filters)
+            items = Product.browse(Product._search_ranked(query, domain, max(limit, 1)))
+
+            return request.make_response(
+                json.dumps({'items': items._get_item_list_data(columns)}),
+                headers=[('Content-Type', 'application/json')]
+            )
+
+        except Exception as e:
+            _logger.error(f"Error occurred while searching items: {str(e)}")
+            return request.make_response(
+                json.dumps({'error': 'Internal Server Error'}),
+                headers=[('Content-Type', 'application/json')],
+                status=500
+            )
+
+    @http.route('/api/item_facets', type='http', auth='public', csrf=False)
+    def api_item_facets(self, **kw):
+        """
+        Value -> count buckets of the filter panel facets under the item list
+        domain built from the same ``search`` parameter and JSON filters as
+        /api/item_list. Responses are ETag validated and cached like the
+        item list.
+        """
+        try:
+            search_query = kw.get('search', '')
+            filters = json.loads(request.httprequest.data or '{}')
+
+            Product = request.env['product.template'].sudo()
+            domain = Product._get_item_list_domain(search_query, filters)
+
+            cache_key = json.dumps(['facets', self._normalize_domain(domain), request.env.lang], default=str)
+            etag = compute_etag(Product, domain, Product._get_item_list_comodels(), cache_key)
+            if etag_matches(etag):
+                return not_modified_response(etag)
+
+            payload = item_list_cache.get(request.db, cache_key, etag)
+            if payload is None:
+                facets = {
+                    facet: self._get_facet_buckets(Product, domain, fnames)
+                    for facet, fnames in ITEM_FACETS.items()
                 }
-                all_items.append(item_data)
+                payload = json.dumps({'facets': facets}).encode()
+                item_list_cache.set(request.db, cache_key, etag, payload)
+
+            return request.make_response(
+                payload,
+                headers=[('Content-Type', 'application/json')] + etag_headers(etag)
+            )
 
+        except Exception as e:
+            _logger.error(f"Error occurred while computing item facets: {str(e)}")
             return request.make_response(
-                json.dumps({'items': all_items}),
+                json.dumps({'error': 'Internal Server Error'}),
+                headers=[('Content-Type', 'application/json')],
+                status=500
+            )
+
+    def _get_facet_buckets(self, Product, domain, fnames):
+        """Grouped counts of the values of fnames, merged into one list of buckets sorted by count"""
+        buckets = {}
+        for fname in fnames:
+            if fname not in Product._fields:
+                continue
+            field = Product._fields[fname]
+            for value, count in Product._read_group(domain, [fname], ['__count']):
+                if not value:
+                    continue
+                if field.type == 'many2one':
+                    key, label = value.id, value.name
+                elif field.type == 'selection':
+                    key, label = value, dict(field._description_selection(request.env)).get(value, value)
+                else:
+                    key, label = value, value
+                bucket = buckets.setdefault(key, {'value': key, 'label': label, 'count': 0})
+                bucket['count'] += count
+        return sorted(buckets.values(), key=lambda bucket: (-bucket['count'], str(bucket['label'])))
+
+    @http.route('/api/item_changes', type='http', auth='public', methods=['GET'], csrf=False)
+    def api_item_changes(self, **kw):
+        """
+        Delta sync of the item list.
+
+        Returns the active items created or modified since the ``since``
+        token, the ids archived or deleted since then, and the token to pass
+        next time. Without ``since`` every active item is returned. Clients
+        must apply ``deleted`` then upsert ``items`` by id: the window right
+        before the token is re-read, so an item may be sent twice. ``fields``
+        works as for /api/item_list. A token older than the tombstone
+        retention gets a 410 and the client must resync from scratch.
+        """
+        try:
+            try:
+                since = self._decode_sync_token(kw['since']) if kw.get('since') else None
+            except ValueError:
+                return request.make_response(
+                    json.dumps({'error': 'Invalid since token'}),
+                    headers=[('Content-Type', 'application/json')],
+                    status=400
+                )
+
+            now = request.env.cr.now()
+            if since and since < now - timedelta(days=TOMBSTONE_RETENTION_DAYS):
+                return request.make_response(
+                    json.dumps({'error': 'Token expired, full resync required'}),
+                    headers=[('Content-Type', 'application/json')],
+                    status=410
+                )
+
+            columns = [c.strip() for c in kw['fields'].split(',') if c.strip()] if kw.get('fields') else None
+            Product = request.env['product.template'].sudo()
+
+            domain = []
+            deleted_ids = set()
+            if since:
+                window_start = since - ITEM_SYNC_OVERLAP
+                domain = [('write_date', '>=', window_start)]
+                tombstones = request.env['kiss_pos.item_tombstone'].sudo().search_read(
+                    [('create_date', '>=', window_start)], ['product_tmpl_id']
+                )
+                deleted_ids = {tombstone['product_tmpl_id'] for tombstone in tombstones}
+
+            items = Product.search(domain, order="id desc")
+            # An item archived then restored within the window is a change, not a removal
+            deleted_ids -= set(items.ids)
+
+            return request.make_response(
+                json.dumps({
+                    'items': items._get_item_list_data(columns),
+                    'deleted': sorted(deleted_ids),
+                    'next_token': self._encode_sync_token(now),
+                }),
                 headers=[('Content-Type', 'application/json')]
             )
 
         except Exception as e:
-            _logger.error(f"Error occurred while fetching items: {str(e)}")
+            _logger.error(f"Error occurred while fetching item changes: {str(e)}")
             return request.make_response(
                 json.dumps({'error': 'Internal Server Error'}),
                 headers=[('Content-Type', 'application/json')],
                 status=500
             )
-            
+
+    def _encode_sync_token(self, watermark):
+        payload = json.dumps({'since': watermark.isoformat()}).encode()
+        return base64.urlsafe_b64encode(payload).decode()
+
+    def _decode_sync_token(self, token):
+        """Decode a token produced by _encode_sync_token into its watermark, raising ValueError if malformed"""
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+            return datetime.fromisoformat(payload['since'])
+        except (binascii.Error, KeyError, TypeError, UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ValueError(f"Invalid sync token: {token}") from e
+
+    @http.route('/api/item_list/cache_stats', type='http', auth='user', methods=['GET'], csrf=False)
+    def api_item_list_cache_stats(self, **kw):
+        """Size and hit/miss counters of this worker's item list cache"""
+        return request.make_response(
+            json.dumps(item_list_cache.stats(request.db)),
+            headers=[('Content-Type', 'application/json')]
+        )
+
+    def _normalize_domain(self, domain):
+        """Order-insensitive form of domain, used for cache keys"""
+        return [
+            (leaf[0], leaf[1], sorted(leaf[2], key=str) if isinstance(leaf[2], (list, tuple)) else leaf[2])
+            if isinstance(leaf, (list, tuple)) else leaf
+            for leaf in domain
+        ]
+
+    def _stream_item_list(self, domain, columns, batch_size, etag):
+        """Return a response streaming {"items": [...]} in batches of batch_size records"""
+        # The response body is generated after the request cursor is closed,
+        # so the generator works on its own cursor and environment.
+        dbname = request.db
+        uid = request.env.uid
+        context = dict(request.env.context)
+
+        def generate():
+            with Registry(dbname).cursor() as cr:
+                env = api.Environment(cr, uid, context)
+                Product = env['product.template'].sudo()
+                separator = ''
+                yield '{"items": ['
+                try:
+                    for items in Product._iter_item_batches(domain, batch_size):
+                        chunk = ','.join(json.dumps(item_data) for item_data in items._get_item_list_data(columns))
+                        yield separator + chunk
+                        separator = ','
+                except Exception as e:
+                    # Headers are already sent, the client sees a truncated body
+                    _logger.error(f"Error occurred while streaming items: {str(e)}")
+                    return
+                yield ']}'
+
+        return Response(
+            generate(),
+            headers=[('Content-Type', 'application/json')] + etag_headers(etag),
+            direct_passthrough=True
+        )
+
+    def _stream_export(self, domain, exported, fmt):
+        """Return a download response of the items matching domain, as ``(column, label)`` pairs"""
+        # Like _stream_item_list, the body is generated on its own cursor
+        dbname = request.db
+        uid = request.env.uid
+        context = dict(request.env.context)
+        columns = [column for column, label in exported]
+        labels = [label for column, label in exported]
+        content_type, filename = ITEM_EXPORT_FORMATS[fmt]
+
+        def cell(value):
+            if isinstance(value, (dict, list)):
+                return json.dumps(value)
+            return '' if value is None else value
+
+        def rows(env):
+            Product = env['product.template'].sudo()
+            for items in Product._iter_item_batches(domain, ITEM_EXPORT_BATCH_SIZE):
+                yield [
+                    [cell(item_data[column]) for column in columns]
+                    for item_data in items._get_item_list_data(columns)
+                ]
+
+        def generate_csv():
+            with Registry(dbname).cursor() as cr:
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(labels)
+                try:
+                    for batch in rows(api.Environment(cr, uid, context)):
+                        writer.writerows(batch)
+                        yield buffer.getvalue()
+                        buffer.seek(0)
+                        buffer.truncate()
+                except Exception as e:
+                    # Headers are already sent, the client sees a truncated file
+                    _logger.error(f"Error occurred while streaming the export: {str(e)}")
+                    return
+                yield buffer.getvalue()
+
+        def generate_xlsx():
+            # constant_memory flushes every row to disk once the next one starts
+            with Registry(dbname).cursor() as cr, tempfile.TemporaryFile() as output:
+                try:
+                    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+                    sheet = workbook.add_worksheet('Items')
+                    sheet.write_row(0, 0, labels)
+                    row_index = 1
+                    for batch in rows(api.Environment(cr, uid, context)):
+                        for values in batch:
+                            sheet.write_row(row_index, 0, values)
+                            row_index += 1
+                    workbook.close()
+                except Exception as e:
+                    _logger.error(f"Error occurred while writing the export: {str(e)}")
+                    return
+                output.seek(0)
+                while chunk := output.read(65536):
+                    yield chunk
+
+        return Response(
+            generate_csv() if fmt == 'csv' else generate_xlsx(),
+            headers=[('Content-Type', content_type), ('Content-Disposition', content_disposition(filename))],
+            direct_passthrough=True
+        )
+
+    def _parse_order(self, order):
+        """Parse an ``order`` parameter such as ``unit_price asc`` into (key, descending)"""
+        if not order:
+            return 'id', True
+        key, _sep, direction = order.strip().partition(' ')
+        direction = direction.strip().lower() or 'desc'
+        if key not in ITEM_LIST_ORDERS or direction not in ('asc', 'desc'):
+            raise ValueError(f"Invalid order: {order}")
+        return key, direction == 'desc'
+
+    def _encode_cursor(self, order, descending, value, last_id):
+        """Encode the keyset position of the last returned item as an opaque token"""
+        payload = json.dumps({'order': order, 'desc': descending, 'value': value, 'id': last_id}, default=str).encode()
+        return base64.urlsafe_b64encode(payload).decode()
+
+    def _decode_cursor(self, cursor, order, descending):
+        """
+        Decode a token produced by _encode_cursor into its ``(value, id)``
+        position, raising ValueError if it is malformed or was issued for
+        another sort order.
+        """
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if payload['order'] != order or payload['desc'] != descending:
+                raise ValueError(f"Cursor does not match order: {cursor}")
+            return payload['value'], int(payload['id'])
+        except (binascii.Error, KeyError, TypeError, UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+
     @http.route('/api/add_item', type='json', auth='public', methods=['POST'], csrf=False)
     def api_add_item(self, **kw):
         _logger.info(f"API request received with data: {kw}")  # Log the received data
 
         try:
-            # Extract the item details from the request
             item_name = kw.get('item_name')
             barcode = kw.get('barcode')
-            sku = kw.get('sku')
-            selling_price = kw.get('selling_price')
-            cost = kw.get('cost')
-            msrp = kw.get('msrp')
-            status = kw.get('status')
-            company_id = kw.get('company_id')
-            parent_company_id = kw.get('parent_company_id')
-            brand = kw.get('brand')
-            categ_id = kw.get('categ_id')
-            on_hand = kw.get('on_hand')
-            age_restriction = kw.get('age_restriction')
-            use_ebt = kw.get('use_ebt')
-            volume = kw.get('volume')
-            weight = kw.get('weight')
-            vendor1_id = kw.get('vendor1_id')
-            vendor2_id = kw.get('vendor2_id')
-            item_type = kw.get('item_type')
-            item_unit = kw.get('item_unit')
-            packaging_type = kw.get('packaging_type')
-            srs_category = kw.get('srs_category')
-            inventory_tracking = kw.get('inventory_tracking')
-            in_transit = kw.get('in_transit')
-            reorder_point = kw.get('reorder_point')
-            restock_level = kw.get('restock_level')
-            min_order_qty = kw.get('min_order_qty')
-            color = kw.get('color')
-            size = kw.get('size')
-            dimension = kw.get('dimension')
-            tax_code = kw.get('tax_code')
-            
-            # Log the extracted values for debugging
-            _logger.info(f"item_name: {item_name}, barcode: {barcode}, status: {status}")
-            
-            # Validate required fields
-            if not item_name or not barcode or not categ_id:
+            product_vals, error = self._prepare_item_vals(kw, request.env['product.template']._fields)
+            if error:
                 return {
                     'success': False,
-                    'error': 'Item Name, Barcode and Category are required fields.'
+                    'error': error
                 }
-                
-            # Convert numeric values and handle empty strings
-            selling_price = float(selling_price) if selling_price and str(selling_price).strip() else 0.0
-            cost = float(cost) if cost and str(cost).strip() else 0.0
-            msrp = float(msrp) if msrp and str(msrp).strip() else 0.0
-            volume = float(volume) if volume and str(volume).strip() else 0.0
-            weight = float(weight) if weight and str(weight).strip() else 0.0
-            reorder_point = float(reorder_point) if reorder_point and str(reorder_point).strip() else 0.0
-            restock_level = float(restock_level) if restock_level and str(restock_level).strip() else 0.0
-            min_order_qty = float(min_order_qty) if min_order_qty and str(min_order_qty).strip() else 0.0
-            on_hand = float(on_hand) if on_hand and str(on_hand).strip() else 0.0
-            in_transit = float(in_transit) if in_transit and str(in_transit).strip() else 0.0
-            
-            # Convert boolean fields properly
-            age_restriction = bool(age_restriction) if age_restriction is not None else False
-            use_ebt = bool(use_ebt) if use_ebt is not None else False
-            inventory_tracking = bool(inventory_tracking) if inventory_tracking is not None else True
-            
-            # Validate status
-            if status and status not in VALID_STATUSES:
-                _logger.warning(f"Invalid status '{status}' provided, defaulting to 'Not Confirmed'")
-                status = "Not Confirmed"
-            elif not status:
-                status = "Not Confirmed"  # Default status if none provided
-                
-            # Prepare product data
-            product_vals = {
-                'name': item_name,                           
-                'barcode': barcode,                          
-                'default_code': sku,                         
-                'list_price': selling_price,                
-                'standard_price': cost,                      
-                'item_status': status,                       
-                'msrp': msrp,                                
-                'active': True,  
-                'volume': volume,
-                'weight': weight,
-                'color_name': color,
-                'feed_brand_id': int(brand) if brand else False,
-                'on_hand': on_hand,
-                'age_restriction': age_restriction,
-                'use_ebt': use_ebt,
-                'item_unit': item_unit,
-                'item_type': item_type,
-                'tax_code':tax_code,
-                'packaging_type': packaging_type, 
-                'srs_category': srs_category,
-                'inventory_tracking': inventory_tracking,
-                'in_transit': in_transit,
-                'reorder_point': reorder_point,
-                'restock_level': restock_level,
-                'min_order_qty': min_order_qty,
-                'size': size,
-                'dimension': dimension,
-                'company_id': int(company_id) if company_id else False,
-                'parent_company_id': int(parent_company_id) if parent_company_id else False,
-                'categ_id': int(categ_id) if categ_id else False,
-                'vendor1_id': int(vendor1_id) if vendor1_id else False,
-                'vendor2_id': int(vendor2_id) if vendor2_id else False,
-            }
-            
-            
-            # Remove None values to avoid errors
-            product_vals = {k: v for k, v in product_vals.items() if v is not None}
-            
-            # Get the fields of the product.template model
-            model_fields = request.env['product.template']._fields
-            
-            # Keep only fields that exist in the model
-            product_vals = {k: v for k, v in product_vals.items() if k in model_fields}
-               
+
             # Create the new product template (item)
             product = request.env['product.template'].sudo().create(product_vals)
             _logger.info(f"Created new item: {item_name} with Barcode: {barcode}")
@@ -304,7 +665,459 @@ class ItemController(http.Controller):
                 "success": False,
                 "error": f"Error creating item: {str(e)}"
             }
+
+    @http.route('/api/add_items', type='json', auth='public', methods=['POST'], csrf=False)
+    def api_add_items(self, items=None, **kw):
+        """
+        Create several items at once from ``items``, a list of the same
+        objects /api/add_item takes. Rows are validated and coerced in one
+        pass and the valid ones created with a single create() call; if that
+        fails, they are created one by one to report the failing rows. The
+        result holds one entry per posted row, in order.
+        """
+        if not isinstance(items, list) or not items:
+            return {
+                'success': False,
+                'error': 'Items must be provided as a non-empty list.'
+            }
+        _logger.info(f"Processing batch creation of {len(items)} items")
+
+        try:
+            Product = request.env['product.template'].sudo()
+            results, saved = self._save_items(
+                items, lambda vals_list, posted: list(Product.create(vals_list)), "Error creating item"
+            )
+
+            for index, product in saved:
+                results[index] = {
+                    'success': True,
+                    'item_id': product.id,
+                    'message': f"Item '{items[index].get('item_name')}' created successfully"
+                }
+
+            created_count = len(saved)
+            _logger.info(f"Created {created_count} of {len(items)} items")
+            return {
+                'success': created_count > 0,
+                'created': created_count,
+                'failed': len(items) - created_count,
+                'results': results
+            }
+
+        except ConcurrencyError:
+            # Retried by Odoo in a new transaction
+            raise
+        except Exception as e:
+            _logger.error(f"Error occurred while adding items: {str(e)}")
+            return {
+                "success": False,
+                "error": f"Error creating items: {str(e)}"
+            }
+
+    @http.route('/api/upsert_items', type='json', auth='public', methods=['POST'], csrf=False)
+    def api_upsert_items(self, items=None, **kw):
+        """
+        Create or update items keyed on their barcode (and company), taking
+        the same ``items`` as /api/add_items. Pushing the same items again
+        updates them instead of creating duplicates, without the caller
+        looking them up first. Each result tells whether the item was
+        created.
+        """
+        if not isinstance(items, list) or not items:
+            return {
+                'success': False,
+                'error': 'Items must be provided as a non-empty list.'
+            }
+        _logger.info(f"Processing upsert of {len(items)} items")
+
+        try:
+            Product = request.env['product.template'].sudo()
+            # Existing items only get the values that were posted, the
+            # defaults of _prepare_item_vals are for the new ones
+            results, saved = self._save_items(items, lambda vals_list, posted: Product._upsert_by_barcode(
+                vals_list, [self._get_posted_vals(vals, item) for vals, item in zip(vals_list, posted)]
+            ), "Error saving item")
+
+            for index, (product, created) in saved:
+                results[index] = {
+                    'success': True,
+                    'item_id': product.id,
+                    'created': created,
+                }
+
+            return {
+                'success': bool(saved),
+                'created': sum(1 for index, (product, created) in saved if created),
+                'updated': sum(1 for index, (product, created) in saved if not created),
+                'failed': len(items) - len(saved),
+                'results': results
+            }
+
+        except ConcurrencyError:
+            # Retried by Odoo in a new transaction
+            raise
+        except Exception as e:
+            _logger.error(f"Error occurred while upserting items: {str(e)}")
+            return {
+                "success": False,
+                "error": f"Error saving items: {str(e)}"
+            }
+
+    def _save_items(self, items, operation, error_label):
+        """
+        Validate the posted items and save the valid ones with
+        ``operation(vals_list, posted items)``, which returns one result per
+        values. If the batch fails, the rows are saved one by one to report
+        the failing ones. Returns the per-row results, the successful rows left to None,
+        and ``[(index, operation result)]`` of the rows saved.
+        """
+        model_fields = request.env['product.template']._fields
+        results = [None] * len(items)
+        vals_list = []
+        indexes = []
+        for index, item in enumerate(items):
+            try:
+                product_vals, error = self._prepare_item_vals(item, model_fields)
+            except Exception as e:
+                product_vals, error = None, f"{error_label}: {str(e)}"
+            if error:
+                results[index] = {'success': False, 'error': error}
+            else:
+                vals_list.append(product_vals)
+                indexes.append(index)
+
+        try:
+            with request.env.cr.savepoint():
+                saved = list(zip(indexes, operation(vals_list, [items[index] for index in indexes])))
+        except ConcurrencyError:
+            # Retried by Odoo in a new transaction
+            raise
+        except Exception as e:
+            _logger.warning(f"Batch save of {len(vals_list)} items failed, retrying row by row: {str(e)}")
+            saved = []
+            for index, product_vals in zip(indexes, vals_list):
+                try:
+                    with request.env.cr.savepoint():
+                        saved.append((index, operation([product_vals], [items[index]])[0]))
+                except ConcurrencyError:
+                    # Retried by Odoo in a new transaction
+                    raise
+                except Exception as row_error:
+                    results[index] = {'success': False, 'error': f"{error_label}: {str(row_error)}"}
+        return results, saved
+
+    def _get_posted_vals(self, vals, item):
+        """The values of vals coming from keys present in the posted item"""
+        return {fname: value for fname, value in vals.items() if ITEM_POSTED_KEYS.get(fname) in item}
+
+    def _prepare_item_vals(self, kw, model_fields):
+        """
+        Validate and coerce one posted item into product.template values,
+        keeping only the fields of model_fields. Returns ``(vals, error)``
+        where error is set when a required field is missing.
+        """
+        # Extract the item details from the request
+        item_name = kw.get('item_name')
+        barcode = kw.get('barcode')
+        sku = kw.get('sku')
+        selling_price = kw.get('selling_price')
+        cost = kw.get('cost')
+        msrp = kw.get('msrp')
+        status = kw.get('status')
+        company_id = kw.get('company_id')
+        parent_company_id = kw.get('parent_company_id')
+        brand = kw.get('brand')
+        categ_id = kw.get('categ_id')
+        on_hand = kw.get('on_hand')
+        age_restriction = kw.get('age_restriction')
+        use_ebt = kw.get('use_ebt')
+        volume = kw.get('volume')
+        weight = kw.get('weight')
+        vendor1_id = kw.get('vendor1_id')
+        vendor2_id = kw.get('vendor2_id')
+        item_type = kw.get('item_type')
+        item_unit = kw.get('item_unit')
+        packaging_type = kw.get('packaging_type')
+        srs_category = kw.get('srs_category')
+        inventory_tracking = kw.get('inventory_tracking')
+        in_transit = kw.get('in_transit')
+        reorder_point = kw.get('reorder_point')
+        restock_level = kw.get('restock_level')
+        min_order_qty = kw.get('min_order_qty')
+        color = kw.get('color')
+        size = kw.get('size')
+        dimension = kw.get('dimension')
+        tax_code = kw.get('tax_code')
+        
+        # Log the extracted values for debugging
+        _logger.info(f"item_name: {item_name}, barcode: {barcode}, status: {status}")
+        
+        # Validate required fields
+        if not item_name or not barcode or not categ_id:
+            return None, 'Item Name, Barcode and Category are required fields.'
+            
+        # Convert numeric values and handle empty strings
+        selling_price = float(selling_price) if selling_price and str(selling_price).strip() else 0.0
+        cost = float(cost) if cost and str(cost).strip() else 0.0
+        msrp = float(msrp) if msrp and str(msrp).strip() else 0.0
+        volume = float(volume) if volume and str(volume).strip() else 0.0
+        weight = float(weight) if weight and str(weight).strip() else 0.0
+        reorder_point = float(reorder_point) if reorder_point and str(reorder_point).strip() else 0.0
+        restock_level = float(restock_level) if restock_level and str(restock_level).strip() else 0.0
+        min_order_qty = float(min_order_qty) if min_order_qty and str(min_order_qty).strip() else 0.0
+        on_hand = float(on_hand) if on_hand and str(on_hand).strip() else 0.0
+        in_transit = float(in_transit) if in_transit and str(in_transit).strip() else 0.0
+        
+        # Convert boolean fields properly
+        age_restriction = bool(age_restriction) if age_restriction is not None else False
+        use_ebt = bool(use_ebt) if use_ebt is not None else False
+        inventory_tracking = bool(inventory_tracking) if inventory_tracking is not None else True
+        
+        # Validate status
+        if status and status not in VALID_STATUSES:
+            _logger.warning(f"Invalid status '{status}' provided, defaulting to 'Not Confirmed'")
+            status = "Not Confirmed"
+        elif not status:
+            status = "Not Confirmed"  # Default status if none provided
+            
+        # Prepare product data
+        product_vals = {
+            'name': item_name,                           
+            'barcode': barcode,                          
+            'default_code': sku,                         
+            'list_price': selling_price,                
+            'standard_price': cost,                      
+            'item_status': status,                       
+            'msrp': msrp,                                
+            'active': True,  
+            'volume': volume,
+            'weight': weight,
+            'color_name': color,
+            'feed_brand_id': int(brand) if brand else False,
+            'on_hand': on_hand,
+            'age_restriction': age_restriction,
+            'use_ebt': use_ebt,
+            'item_unit': item_unit,
+            'item_type': item_type,
+            'tax_code':tax_code,
+            'packaging_type': packaging_type, 
+            'srs_category': srs_category,
+            'inventory_tracking': inventory_tracking,
+            'in_transit': in_transit,
+            'reorder_point': reorder_point,
+            'restock_level': restock_level,
+            'min_order_qty': min_order_qty,
+            'size': size,
+            'dimension': dimension,
+            'company_id': int(company_id) if company_id else False,
+            'parent_company_id': int(parent_company_id) if parent_company_id else False,
+            'categ_id': int(categ_id) if categ_id else False,
+            'vendor1_id': int(vendor1_id) if vendor1_id else False,
+            'vendor2_id': int(vendor2_id) if vendor2_id else False,
+        }
+        
         
+        # Remove None values to avoid errors
+        product_vals = {k: v for k, v in product_vals.items() if v is not None}
+        
+        # Keep only fields that exist in the model
+        product_vals = {k: v for k, v in product_vals.items() if k in model_fields}
+        return product_vals, None
+
+    @http.route('/api/import_items', type='http', auth='public', methods=['POST'], csrf=False)
+    def api_import_items(self, file=None, **kw):
+        """
+        Import items from an uploaded CSV or XLSX ``file`` (multipart form
+        data) with the item_name, sku, description, barcode and
+        selling_price columns. Items are matched on barcode: existing ones
+        are updated when their values differ, the others are created.
+        """
+        if not file or not getattr(file, 'filename', None):
+            return request.make_response(
+                json.dumps({'success': False, 'error': 'No file uploaded.'}),
+                headers=[('Content-Type', 'application/json')],
+                status=400
+            )
+        _logger.info(f"Importing items from {file.filename}")
+
+        try:
+            result = request.env['kiss_pos.item_importer']._import_file(file.stream, file.filename)
+            _logger.info(f"Imported {file.filename}: {result['created']} created, {result['updated']} updated, "
+                         f"{result['skipped']} skipped, {result['failed']} failed")
+            return request.make_response(
+                json.dumps(dict(result, success=True)),
+                headers=[('Content-Type', 'application/json')]
+            )
+
+        except ValueError as e:
+            return request.make_response(
+                json.dumps({'success': False, 'error': str(e)}),
+                headers=[('Content-Type', 'application/json')],
+                status=400
+            )
+        except ConcurrencyError:
+            # Retried by Odoo in a new transaction
+            raise
+        except Exception as e:
+            _logger.error(f"Error occurred while importing items: {str(e)}")
+            return request.make_response(
+                json.dumps({'success': False, 'error': 'Internal Server Error'}),
+                headers=[('Content-Type', 'application/json')],
+                status=500
+            )
+
+    @http.route('/api/import_jobs', type='http', auth='public', methods=['POST'], csrf=False)
+    def api_create_import_job(self, file=None, **kw):
+        """
+        Queue the import of an uploaded CSV or XLSX ``file`` as a background
+        job and return its id, to be polled on /api/import_jobs/<id>.
+        """
+        if not file or not getattr(file, 'filename', None):
+            return request.make_response(
+                json.dumps({'success': False, 'error': 'No file uploaded.'}),
+                headers=[('Content-Type', 'application/json')],
+                status=400
+            )
+
+        try:
+            job = request.env['kiss_pos.import_job'].sudo()._enqueue(file, file.filename)
+            _logger.info(f"Queued import job {job.id} for {file.filename} ({job.row_count} rows)")
+            return request.make_response(
+                json.dumps({'success': True, 'job_id': job.id, 'row_count': job.row_count}),
+                headers=[('Content-Type', 'application/json')]
+            )
+
+        except ValueError as e:
+            return request.make_response(
+                json.dumps({'success': False, 'error': str(e)}),
+                headers=[('Content-Type', 'application/json')],
+                status=400
+            )
+        except Exception as e:
+            _logger.error(f"Error occurred while queuing import job: {str(e)}")
+            return request.make_response(
+                json.dumps({'success': False, 'error': 'Internal Server Error'}),
+                headers=[('Content-Type', 'application/json')],
+                status=500
+            )
+
+    @http.route('/api/import_jobs/<int:job_id>', type='http', auth='public', methods=['GET'], csrf=False)
+    def api_import_job_status(self, job_id, **kw):
+        """Progress of an import job of the current user: counts, throughput (rows/s) and row errors"""
+        try:
+            job = request.env['kiss_pos.import_job'].sudo().search([
+                ('id', '=', job_id),
+                ('user_id', '=', request.env.user.id),
+            ], limit=1)
+            if not job:
+                return request.make_response(
+                    json.dumps({'error': 'Import job not found'}),
+                    headers=[('Content-Type', 'application/json')],
+                    status=404
+                )
+
+            return request.make_response(
+                json.dumps(job._get_progress()),
+                headers=[('Content-Type', 'application/json'), ('Cache-Control', 'no-store')]
+            )
+
+        except Exception as e:
+            _logger.error(f"Error occurred while fetching import job {job_id}: {str(e)}")
+            return request.make_response(
+                json.dumps({'error': 'Internal Server Error'}),
+                headers=[('Content-Type', 'application/json')],
+                status=500
+            )
+
+    @http.route('/api/bulk_edit', type='http', auth='public', methods=['POST'], csrf=False)
+    def api_bulk_edit(self, **kw):
+        """
+        Edit one field of many items at once. The JSON body holds the items
+        as ``ids`` or as item list ``filters`` (with an optional ``search``),
+        the bulk edit ``field`` key, the ``operation`` (``set``,
+        ``increase`` or ``decrease``), the ``value`` and for increases and
+        decreases the ``unit`` (``%`` or ``absolute``).
+        """
+        try:
+            data = json.loads(request.httprequest.data or '{}')
+            if isinstance(data.get('ids'), list):
+                domain = [('id', 'in', [int(item_id) for item_id in data['ids']])]
+            elif isinstance(data.get('filters'), dict):
+                domain = request.env['product.template'].sudo()._get_item_list_domain(
+                    data.get('search', ''), data['filters']
+                )
+            else:
+                return request.make_response(
+                    json.dumps({'success': False, 'error': 'Either ids or filters must be provided.'}),
+                    headers=[('Content-Type', 'application/json')],
+                    status=400
+                )
+
+            try:
+                affected = request.env['kiss_pos.item_bulk_editor']._bulk_edit(
+                    domain, data.get('field'), data.get('operation', 'set'), data.get('value'),
+                    data.get('unit', 'absolute'),
+                )
+            except (ValueError, TypeError) as e:
+                return request.make_response(
+                    json.dumps({'success': False, 'error': str(e)}),
+                    headers=[('Content-Type', 'application/json')],
+                    status=400
+                )
+
+            return request.make_response(
+                json.dumps({'success': True, 'affected': affected}),
+                headers=[('Content-Type', 'application/json')]
+            )
+
+        except Exception as e:
+            _logger.error(f"Error occurred while bulk editing items: {str(e)}")
+            return request.make_response(
+                json.dumps({'success': False, 'error': 'Internal Server Error'}),
+                headers=[('Content-Type', 'application/json')],
+                status=500
+            )
+
+    @http.route('/api/export_items', type='http', auth='public', methods=['POST'], csrf=False)
+    def api_export_items(self, **kw):
+        """
+        Export items as a CSV or XLSX download. The JSON body holds the items
+        as ``ids`` or as item list ``filters`` with an optional ``search``
+        (the whole catalog without either), the item list keys to export as
+        ``columns`` with their optional ``headers`` labels, and the
+        ``format``. Rows are serialized batch by batch while the response
+        is sent, CSV rows being written to the client as they are produced.
+        """
+        try:
+            data = json.loads(request.httprequest.data or '{}')
+            fmt = data.get('format', 'csv')
+            requested = data.get('columns') or []
+            labels = data.get('headers') or requested
+            exported = [(column, label) for column, label in zip(requested, labels) if column in ITEM_LIST_COLUMNS]
+            if fmt not in ITEM_EXPORT_FORMATS or (fmt == 'xlsx' and xlsxwriter is None) or not exported:
+                return request.make_response(
+                    json.dumps({'error': 'Invalid format or columns'}),
+                    headers=[('Content-Type', 'application/json')],
+                    status=400
+                )
+
+            if isinstance(data.get('ids'), list):
+                domain = [('id', 'in', [int(item_id) for item_id in data['ids']])]
+            else:
+                domain = request.env['product.template'].sudo()._get_item_list_domain(
+                    data.get('search', ''), data.get('filters') or {}
+                )
+            _logger.info(f"Exporting items as {fmt} with columns {[column for column, label in exported]}")
+            return self._stream_export(domain, exported, fmt)
+
+        except Exception as e:
+            _logger.error(f"Error occurred while exporting items: {str(e)}")
+            return request.make_response(
+                json.dumps({'error': 'Internal Server Error'}),
+                headers=[('Content-Type', 'application/json')],
+                status=500
+            )
+
     @http.route('/api/update_item_status', type='http', auth='public', methods=['POST'], csrf=False)
     def api_update_item_status(self, **kw):
 
@@ -342,64 +1155,66 @@ class ItemController(http.Controller):
                 'results': []
             }
             
+            Product = request.env['product.template'].sudo()
+
+            # Validate the rows first, then check every id with one query
+            rows = []
             for item in items:
                 item_id = item.get('item_id')
                 item_status = item.get('item_status')
-                
-                # Skip items without required fields
+                error = None
+                record_id = None
+
                 if not item_id or not item_status:
+                    error = 'Both item_id and item_status are required.'
+                elif item_status not in VALID_STATUSES:
+                    error = f"Invalid status '{item_status}'."
+                else:
+                    try:
+                        record_id = int(item_id)
+                    except (TypeError, ValueError):
+                        error = f"Invalid item_id '{item_id}'."
+                rows.append((item_id, record_id, item_status, error))
+
+            products = Product.browse({row[1] for row in rows if row[1]}).exists()
+            names = {product.id: product.name for product in products}
+
+            # One write per target status; a repeated item keeps its last status
+            status_by_id = {record_id: item_status for item_id, record_id, item_status, error in rows if record_id in names}
+            ids_by_status = {}
+            for record_id, item_status in status_by_id.items():
+                ids_by_status.setdefault(item_status, []).append(record_id)
+
+            write_errors = {}
+            for item_status, record_ids in ids_by_status.items():
+                try:
+                    with request.env.cr.savepoint():
+                        Product.browse(record_ids).write({'item_status': item_status})
+                except Exception as e:
+                    _logger.error(f"Error updating {len(record_ids)} items to status {item_status}: {str(e)}")
+                    write_errors[item_status] = str(e)
+
+            for item_id, record_id, item_status, error in rows:
+                if not error and record_id not in names:
+                    error = "Item not found."
+                if not error:
+                    error = write_errors.get(item_status)
+                if error:
                     results['results'].append({
                         'item_id': item_id,
                         'success': False,
-                        'error': 'Both item_id and item_status are required.'
-                    })
-                    results['failed'] += 1
-                    continue
-                    
-                if item_status not in VALID_STATUSES:
-                    results['results'].append({
-                        'item_id': item_id,
-                        'success': False,
-                        'error': f"Invalid status '{item_status}'."
+                        'error': error
                     })
                     results['failed'] += 1
-                    continue
-                
-                try:
-                    # Find the product by ID
-                    product = request.env['product.template'].sudo().browse(int(item_id))
-                    
-                    if not product.exists():
-                        results['results'].append({
-                            'item_id': item_id,
-                            'success': False,
-                            'error': f"Item not found."
-                        })
-                        results['failed'] += 1
-                        continue
-                        
-                    # Update the item status
-                    product.write({
-                        'item_status': item_status
-                    })
-                    
+                else:
                     results['results'].append({
                         'item_id': item_id,
-                        'name': product.name,
+                        'name': names[record_id],
                         'success': True,
                         'message': f"Status updated to '{item_status}' successfully"
                     })
                     results['processed'] += 1
-                    
-                except Exception as e:
-                    _logger.error(f"Error updating item {item_id}: {str(e)}")
-                    results['results'].append({
-                        'item_id': item_id,
-                        'success': False,
-                        'error': str(e)
-                    })
-                    results['failed'] += 1
-            
+
             # If all items failed, mark the overall request as failed
             if results['processed'] == 0 and results['failed'] > 0:
                 results['success'] = False
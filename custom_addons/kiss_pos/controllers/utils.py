@@ -0,0 +1,93 @@
+from odoo.http import request
+import hashlib
+import json
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Wire formats of the list endpoints (``format`` parameter)
+LIST_FORMATS = ('json', 'columnar', 'msgpack')
+
+
+def compute_etag(model, domain, related_models=(), *params):
+    """
+    Compute a cheap validator for a list endpoint.
+
+    The validator changes whenever a record matching ``domain`` is created,
+    written or removed, whenever a record of ``related_models`` (whose names
+    appear in the payload) is created, written or deleted, or when the
+    request ``params`` differ. It costs one aggregate query on the model and
+    at most one on the related tables, without reading or serializing any
+    record: the last write of each related table comes from its write_date
+    index (created by kiss_pos), and its deletions from the tuple counters
+    of the PostgreSQL statistics, as deleting the latest written record
+    would otherwise bring the last write back to an earlier one.
+    """
+    count, last_write = model._read_group(domain, [], ['__count', 'write_date:max'])[0]
+
+    related_writes = []
+    tables = sorted({model.env[name]._table for name in related_models if name in model.env})
+    if tables:
+        model.env.cr.execute("SELECT " + ", ".join(
+            f"(SELECT MAX(write_date) FROM {table}), pg_stat_get_tuples_deleted('{table}'::regclass)"
+            for table in tables
+        ))
+        related_writes = list(model.env.cr.fetchone())
+
+    key = json.dumps([count, last_write, related_writes, model.env.lang, params], default=str, sort_keys=True)
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def etag_matches(etag):
+    """Whether the client already holds the representation identified by etag"""
+    return request.httprequest.if_none_match.contains_weak(etag)
+
+
+def etag_headers(etag):
+    """Headers letting the client cache the response but revalidate it on every use"""
+    return [('ETag', f'"{etag}"'), ('Cache-Control', 'no-cache')]
+
+
+def not_modified_response(etag):
+    """Empty 304 response for a matching If-None-Match"""
+    return request.make_response('', headers=etag_headers(etag), status=304)
+
+
+def parse_list_format(fmt):
+    """Validate a ``format`` parameter, raising ValueError for unknown or unavailable formats"""
+    fmt = fmt or 'json'
+    if fmt not in LIST_FORMATS:
+        raise ValueError(f"Unknown format: {fmt}")
+    if fmt == 'msgpack' and msgpack is None:
+        raise ValueError("MessagePack is not available on this server")
+    return fmt
+
+
+def to_columnar(rows, columns, dictionary_columns=()):
+    """
+    Turn a list of row dicts into column arrays.
+
+    Columns listed in ``dictionary_columns`` hold indexes into
+    ``dictionaries[column]`` instead of repeating the same strings on every
+    row (categories, brands, suppliers, statuses, ...).
+    """
+    data = {}
+    dictionaries = {}
+    for column in columns:
+        values = [row.get(column) for row in rows]
+        if column in dictionary_columns:
+            index = {}
+            data[column] = [index.setdefault(value, len(index)) for value in values]
+            dictionaries[column] = list(index)
+        else:
+            data[column] = values
+    return {'columns': list(columns), 'length': len(rows), 'data': data, 'dictionaries': dictionaries}
+
+
+def encode_payload(payload, fmt):
+    """Serialize a response payload in the given format, returning (body, content type)"""
+    if fmt == 'msgpack':
+        return msgpack.packb(payload, default=str), 'application/x-msgpack'
+    return json.dumps(payload).encode(), 'application/json'
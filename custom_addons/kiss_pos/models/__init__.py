@@ -1,4 +1,14 @@
 from . import item
+from . import product_product
 from . import category
 from . import custom_filter
-from . import label_template
\ No newline at end of file
+from . import label_template
+from . import res_partner
+from . import product_data_feed_brand
+from . import item_tombstone
+from . import item_list_row
+from . import item_importer
+from . import import_job
+from . import item_bulk_editor
+from . import name_resolver
+from . import catalog_snapshot
\ No newline at end of file
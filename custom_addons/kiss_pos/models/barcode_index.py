@@ -0,0 +1,251 @@
+from odoo import api, fields, SUPERUSER_ID
+from odoo.tools import SQL
+from datetime import timedelta
+import logging
+import psycopg2
+import threading
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Sequence bumped after every commit that changed sellable products
+CATALOG_VERSION_SEQUENCE = 'kiss_pos_catalog_version'
+
+# Seconds between two catalog version checks of a worker, i.e. how long a
+# change made by another worker can remain unseen by its scans
+BARCODE_INDEX_CHECK_INTERVAL = 1.0
+
+# Seconds after which an index is rebuilt from scratch, catching what the
+# incremental refreshes cannot see (variants deleted without their
+# template, tax changes)
+BARCODE_INDEX_MAX_AGE = 3600
+
+# Margin on the write_date watermark of the incremental refreshes, covering
+# transactions that committed after a refresh but started before it
+BARCODE_INDEX_OVERLAP = timedelta(minutes=5)
+
+# Delay between a catalog change and the regeneration of the store snapshots
+CATALOG_SNAPSHOT_DELAY = timedelta(minutes=1)
+
+# Template and variant fields the scan entries and the sellable check
+# depend on; writes of other fields leave the catalog version unchanged
+CATALOG_FIELDS = {
+    'name', 'barcode', 'default_code', 'list_price', 'lst_price', 'price_extra', 'taxes_id',
+    'available_in_pos', 'sale_ok', 'active', 'company_id', 'age_restriction', 'use_ebt',
+    'categ_id', 'pos_categ_ids', 'product_template_attribute_value_ids',
+}
+
+# postcommit data key of the transactions that changed the catalog
+CATALOG_CHANGED = 'kiss_pos.catalog_changed'
+
+
+def create_catalog_version_sequence(cr):
+    cr.execute(SQL("CREATE SEQUENCE IF NOT EXISTS %s", SQL.identifier(CATALOG_VERSION_SEQUENCE)))
+
+
+def notify_catalog_change(env):
+    """
+    Bump the catalog version once the current transaction has committed,
+    and have the catalog snapshots of the stores regenerated shortly after.
+    """
+    cr = env.cr
+    if cr.postcommit.data.get(CATALOG_CHANGED):
+        return
+    cr.postcommit.data[CATALOG_CHANGED] = True
+
+    # Delayed so that a burst of changes is picked up by a single run
+    cron = env.ref('kiss_pos.ir_cron_refresh_catalog_snapshots', raise_if_not_found=False)
+    if cron:
+        cron.sudo()._trigger(fields.Datetime.now() + CATALOG_SNAPSHOT_DELAY)
+
+    @cr.postcommit.add
+    def bump():
+        # The changes must be visible before another worker sees the new
+        # version. nextval() is not transactional, so the transaction this
+        # opens on the cursor needs not be committed.
+        try:
+            with cr.savepoint(flush=False):
+                cr.execute(SQL("SELECT nextval(%s)", CATALOG_VERSION_SEQUENCE))
+        except psycopg2.Error as e:
+            _logger.warning(f"Could not bump the catalog version: {str(e)}")
+        barcode_index.expire(cr.dbname)
+
+
+def is_sellable(product, company):
+    """Whether a variant can be scanned and sold by the stores of company"""
+    return bool(
+        product.active and product.product_tmpl_id.active and product.available_in_pos
+        and product.sale_ok and product.barcode and product.company_id.id in (False, company.id)
+    )
+
+
+def get_scan_entry(product, tax_domain, price=None):
+    """Scan entry of a sellable variant, its taxes restricted by tax_domain"""
+    return {
+        'product_id': product.id,
+        'product_tmpl_id': product.product_tmpl_id.id,
+        'name': product.display_name,
+        'barcode': product.barcode,
+        'default_code': product.default_code or None,
+        'price': product.lst_price if price is None else price,
+        'taxes': [{
+            'id': tax.id,
+            'name': tax.name,
+            'amount': tax.amount,
+            'amount_type': tax.amount_type,
+            'price_include': tax.price_include,
+        } for tax in product.taxes_id.filtered_domain(tax_domain)],
+        'age_restriction': product.age_restriction,
+        'use_ebt': product.use_ebt,
+    }
+
+
+class BarcodeIndex:
+    """
+    Per-worker barcode -> sellable product index of the store scans.
+
+    One index is kept per database, company and language. Workers check
+    the catalog version sequence at most every BARCODE_INDEX_CHECK_INTERVAL
+    seconds, and on a new version reload only the variants and templates
+    written since their last refresh and drop the templates tombstoned in
+    the meantime, so a scan is a dict lookup and a catalog change costs
+    one small query per worker.
+    """
+
+    def __init__(self, check_interval=BARCODE_INDEX_CHECK_INTERVAL, max_age=BARCODE_INDEX_MAX_AGE):
+        self.check_interval = check_interval
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._indexes = {}
+        self._updating = {}
+
+    def lookup(self, env, barcode):
+        """Return the scan entry of the sellable product holding barcode, or None"""
+        return self._get_index(env)['products'].get(barcode)
+
+    def expire(self, dbname):
+        """Have the indexes of the database check the catalog version on their next lookup"""
+        with self._lock:
+            for key, index in self._indexes.items():
+                if key[0] == dbname:
+                    index['checked_at'] = 0
+
+    def stats(self, dbname):
+        with self._lock:
+            return [
+                {'company_id': key[1], 'lang': key[2], 'version': index['version'], 'products': len(index['products'])}
+                for key, index in self._indexes.items()
+                if key[0] == dbname
+            ]
+
+    def _get_index(self, env):
+        key = (env.cr.dbname, env.company.id, env.lang or 'en_US')
+        index = self._indexes.get(key)
+        now = time.monotonic()
+        if index and now - index['checked_at'] < self.check_interval:
+            return index
+
+        # A single thread per index brings it up to date, outside of the
+        # lock, while the others keep serving the current one
+        with self._lock:
+            index = self._indexes.get(key)
+            if index and now - index['checked_at'] < self.check_interval:
+                return index
+            updating = self._updating.get(key)
+            if updating is None:
+                updating = self._updating[key] = threading.Event()
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            if index:
+                return index
+            # Nothing to serve before the first build is done
+            updating.wait()
+            return self._indexes.get(key) or self._get_index(env)
+
+        try:
+            # The version is read before the products are, so that a version
+            # never covers changes the products were loaded without
+            env.cr.execute(SQL("SELECT last_value FROM %s", SQL.identifier(CATALOG_VERSION_SEQUENCE)))
+            version = env.cr.fetchone()[0]
+            # Built or refreshed aside and swapped in once complete, so that
+            # the served index is never seen half updated
+            if not index or now - index['built_at'] > self.max_age:
+                index = self._build(env, version)
+            elif index['version'] != version:
+                index = self._refresh(env, index, version)
+            index['checked_at'] = now
+            with self._lock:
+                self._indexes[key] = index
+        finally:
+            with self._lock:
+                del self._updating[key]
+            updating.set()
+        return index
+
+    def _build(self, env, version):
+        index = {'version': version, 'built_at': time.monotonic(), 'checked_at': 0, 'products': {}, 'barcodes': {}}
+        with env.registry.cursor() as cr:
+            Product = self._get_product_model(cr, env)
+            index['synced_at'] = cr.now()
+            products = Product.search([
+                ('barcode', '!=', False),
+                ('available_in_pos', '=', True),
+                ('sale_ok', '=', True),
+                ('company_id', 'in', [False, Product.env.company.id]),
+            ])
+            self._update(index, products)
+        _logger.info(f"Built the barcode index of {env.cr.dbname} with {len(index['products'])} products")
+        return index
+
+    def _refresh(self, env, index, version):
+        """Copy of index brought up to date with the changes since its last refresh"""
+        index = dict(index, products=dict(index['products']), barcodes=dict(index['barcodes']))
+        with env.registry.cursor() as cr:
+            Product = self._get_product_model(cr, env)
+            since = index['synced_at'] - BARCODE_INDEX_OVERLAP
+            index['synced_at'] = cr.now()
+            # Tombstones go first: a template archived then restored within
+            # the window is written again, and re-added by the update below
+            tombstones = Product.env['kiss_pos.item_tombstone'].search_read(
+                [('create_date', '>', since)], ['product_tmpl_id']
+            )
+            removed_tmpl_ids = {tombstone['product_tmpl_id'] for tombstone in tombstones}
+            if removed_tmpl_ids:
+                for barcode, entry in list(index['products'].items()):
+                    if entry['product_tmpl_id'] in removed_tmpl_ids:
+                        self._remove(index, entry['product_id'])
+
+            products = Product.with_context(active_test=False).search([
+                '|', ('write_date', '>', since), ('product_tmpl_id.write_date', '>', since),
+            ])
+            self._update(index, products)
+        index['version'] = version
+        return index
+
+    def _get_product_model(self, cr, env):
+        """product.product on a separate cursor, in the company and language of env"""
+        company_id = env.company.id
+        env = api.Environment(cr, SUPERUSER_ID, {'lang': env.lang or 'en_US'})
+        return env['product.product'].with_company(company_id)
+
+    def _update(self, index, products):
+        """Add, replace or drop the entries of products"""
+        company = products.env.company
+        Tax = products.env['account.tax']
+        tax_domain = Tax._check_company_domain(company)
+        for product in products:
+            self._remove(index, product.id)
+            if is_sellable(product, company):
+                index['products'][product.barcode] = get_scan_entry(product, tax_domain)
+                index['barcodes'][product.id] = product.barcode
+
+    def _remove(self, index, product_id):
+        barcode = index['barcodes'].pop(product_id, None)
+        entry = index['products'].get(barcode)
+        if entry and entry['product_id'] == product_id:
+            del index['products'][barcode]
+
+
+barcode_index = BarcodeIndex()
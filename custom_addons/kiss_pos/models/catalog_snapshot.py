@@ -0,0 +1,174 @@
+from odoo import api, fields, models
+from odoo.tools import SQL
+from datetime import timedelta
+import base64
+import gzip
+import hashlib
+import json
+import logging
+from .barcode_index import BARCODE_INDEX_OVERLAP, CATALOG_VERSION_SEQUENCE, get_scan_entry, is_sellable
+
+_logger = logging.getLogger(__name__)
+
+# Age after which a snapshot is regenerated from scratch, catching what the
+# incremental refreshes cannot see (variants deleted without their
+# template, tax changes)
+CATALOG_SNAPSHOT_MAX_AGE = timedelta(days=1)
+
+class CatalogSnapshot(models.Model):
+    """
+    Compressed catalog of the products a POS sells, so that store terminals
+    boot and scan from a local copy instead of querying the catalog.
+
+    Each snapshot holds the scan entries (prices of the POS pricelist,
+    taxes of its company, barcodes, age restriction and EBT flags) as a
+    gzip compressed JSON attachment. Snapshots are refreshed by a cron
+    triggered after catalog changes: only the products written since the
+    last refresh are re-read and the tombstoned templates dropped, and the
+    version only increases when the content actually changed. Changes of
+    the POS or its pricelist, and age, regenerate them from scratch.
+    """
+    _name = 'kiss_pos.catalog_snapshot'
+    _description = 'POS Catalog Snapshot'
+    _order = 'id'
+    _sql_constraints = [('config_uniq', 'UNIQUE (config_id)', 'A POS has a single catalog snapshot.')]
+
+    config_id = fields.Many2one('pos.config', string='Point of Sale', required=True, ondelete='cascade')
+    version = fields.Integer(string='Version', help="Incremented every time the content of the catalog changes")
+    catalog_version = fields.Integer(string='Catalog Version',
+                                     help="Catalog version sequence value the snapshot is up to date with")
+    file = fields.Binary(string='File', attachment=True, help="Catalog as gzip compressed JSON")
+    checksum = fields.Char(string='Checksum', help="SHA-1 of the uncompressed catalog")
+    product_count = fields.Integer(string='Products')
+    size = fields.Integer(string='Size', help="Compressed size in bytes")
+    built_at = fields.Datetime(string='Built At', help="Last regeneration from scratch")
+    synced_at = fields.Datetime(string='Synced At', help="Products written since then are picked up by the next refresh")
+
+    @api.model
+    def _get_snapshot(self, config):
+        """
+        Snapshot of config, or an empty recordset while it has not been
+        generated yet, in which case the cron is woken up to generate it
+        """
+        snapshot = self.search([('config_id', '=', config.id), ('checksum', '!=', False)])
+        if not snapshot:
+            self.env.ref('kiss_pos.ir_cron_refresh_catalog_snapshots').sudo()._trigger()
+        return snapshot
+
+    @api.model
+    def _cron_refresh_catalog_snapshots(self):
+        configs = self.env['pos.config'].search([])
+        self.create([{'config_id': config.id} for config in configs - self.search([]).config_id])
+        for snapshot in self.search([('config_id', 'in', configs.ids)]):
+            # A new transaction, so that the catalog version read first is
+            # never more recent than the products read after it
+            self.env.cr.commit()
+            try:
+                snapshot._generate()
+            except Exception as e:
+                self.env.cr.rollback()
+                _logger.error(f"Catalog snapshot of POS {snapshot.config_id.id} failed: {str(e)}")
+        self.env.cr.commit()
+
+    def _generate(self):
+        """Bring the snapshot up to date, returning whether its content changed"""
+        self.ensure_one()
+        cr = self.env.cr
+        cr.execute(SQL("SELECT last_value FROM %s", SQL.identifier(CATALOG_VERSION_SEQUENCE)))
+        catalog_version = cr.fetchone()[0]
+        now = cr.now()
+
+        config = self.config_id
+        full = (
+            not self.file or not self.built_at or self.built_at < now - CATALOG_SNAPSHOT_MAX_AGE
+            or self._get_settings_date() > self.built_at
+        )
+        if not full and catalog_version == self.catalog_version:
+            return False
+
+        Product = self.env['product.product'].sudo().with_company(config.company_id).with_context(
+            lang=config.company_id.partner_id.lang or 'en_US'
+        )
+        if full:
+            entries = {}
+            products = Product.search(self._get_product_domain())
+        else:
+            since = self.synced_at - BARCODE_INDEX_OVERLAP
+            tombstones = self.env['kiss_pos.item_tombstone'].sudo().search_read(
+                [('create_date', '>', since)], ['product_tmpl_id']
+            )
+            removed_tmpl_ids = {tombstone['product_tmpl_id'] for tombstone in tombstones}
+            entries = {
+                entry['product_id']: entry
+                for entry in self._read_catalog()['products']
+                if entry['product_tmpl_id'] not in removed_tmpl_ids
+            }
+            products = Product.with_context(active_test=False).search([
+                '|', ('write_date', '>', since), ('product_tmpl_id.write_date', '>', since),
+            ])
+
+        for product in products:
+            entries.pop(product.id, None)
+        available = products.filtered(self._is_available)
+        prices = config.pricelist_id._get_products_price(available, 1.0) if config.pricelist_id else {}
+        tax_domain = self.env['account.tax']._check_company_domain(config.company_id)
+        for product in available:
+            entries[product.id] = get_scan_entry(product, tax_domain, prices.get(product.id))
+
+        catalog = {
+            'config_id': config.id,
+            'company_id': config.company_id.id,
+            'currency': config.currency_id.name,
+            'products': sorted(entries.values(), key=lambda entry: entry['product_id']),
+        }
+        checksum = hashlib.sha1(json.dumps(catalog, sort_keys=True).encode()).hexdigest()
+        vals = {'catalog_version': catalog_version, 'synced_at': now}
+        if full:
+            vals['built_at'] = now
+        changed = checksum != self.checksum
+        if changed:
+            catalog['version'] = self.version + 1
+            data = gzip.compress(json.dumps(catalog, separators=(',', ':')).encode(), mtime=0)
+            vals.update({
+                'version': catalog['version'],
+                'file': base64.b64encode(data),
+                'checksum': checksum,
+                'product_count': len(entries),
+                'size': len(data),
+            })
+            _logger.info(f"Catalog snapshot of POS {config.id} at version {catalog['version']} "
+                         f"({len(entries)} products, {len(data)} bytes, {'full' if full else 'incremental'})")
+        self.write(vals)
+        return changed
+
+    def _get_settings_date(self):
+        """Last change of the POS settings the catalog depends on"""
+        config = self.config_id
+        dates = [config.write_date, config.pricelist_id.write_date, *config.pricelist_id.item_ids.mapped('write_date')]
+        return max(date for date in dates if date)
+
+    def _get_product_domain(self):
+        config = self.config_id
+        domain = [
+            ('barcode', '!=', False),
+            ('available_in_pos', '=', True),
+            ('sale_ok', '=', True),
+            ('company_id', 'in', [False, config.company_id.id]),
+        ]
+        if config.limit_categories and config.iface_available_categ_ids:
+            domain.append(('pos_categ_ids', 'in', config.iface_available_categ_ids.ids))
+        return domain
+
+    def _is_available(self, product):
+        """Whether product is sold by the POS of the snapshot"""
+        config = self.config_id
+        if not is_sellable(product, config.company_id):
+            return False
+        if config.limit_categories and config.iface_available_categ_ids:
+            return bool(product.pos_categ_ids & config.iface_available_categ_ids)
+        return True
+
+    def _read_catalog(self):
+        """Decompressed content of the snapshot"""
+        self.ensure_one()
+        return json.loads(gzip.decompress(base64.b64decode(self.file)))
@@ -1,8 +1,28 @@
 from odoo import models, fields, api
+from .item import create_trigram_indexes
+from .item_list_cache import item_list_cache
 
 class ProductCategoryExtended(models.Model):
     _inherit = "product.category"
     
     # Define the status field
     status = fields.Boolean(string="Status", default=True, 
-                           help="Indicates whether this category is active or inactive")
\ No newline at end of file
+                           help="Indicates whether this category is active or inactive")
+
+    def init(self):
+        super().init()
+        # Used by the category name part of the product list search
+        create_trigram_indexes(self.env.cr, self._table, {
+            'product_category_name_trgm_idx': ('name', "name"),
+        })
+
+    def write(self, vals):
+        # Category names are part of the cached item list payloads
+        if 'name' in vals:
+            item_list_cache.clear(self.env.cr.dbname)
+        res = super().write(vals)
+        if 'name' in vals:
+            templates = self.env['product.template'].with_context(active_test=False).search([('categ_id', 'in', self.ids)])
+            templates._update_search_vector()
+            self.env['kiss_pos.item_list_row']._schedule_refresh(templates.ids)
+        return res
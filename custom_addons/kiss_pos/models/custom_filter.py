@@ -1,4 +1,8 @@
-from odoo import models, fields
+from odoo import api, models, fields
+import json
+import logging
+
+_logger = logging.getLogger(__name__)
 
 class CustomFilter(models.Model):
     _name = "custom.filter"
@@ -14,4 +18,25 @@ class CustomFilter(models.Model):
                                   help="JSON formatted filter parameters")
     active = fields.Boolean(string="Active", default=True,
                            help="Indicates whether this filter is active")
-    
\ No newline at end of file
+    compiled_domain = fields.Text(string="Compiled Domain", compute='_compute_compiled_domain', store=True,
+                                  help="JSON product.template domain of the filter parameters")
+    last_result_count = fields.Integer(string="Last Result Count", readonly=True,
+                                       help="Number of items matched the last time the filter was run")
+
+    @api.depends('filter_parameters')
+    def _compute_compiled_domain(self):
+        Product = self.env['product.template']
+        for record in self:
+            try:
+                parameters = json.loads(record.filter_parameters or '{}')
+            except json.JSONDecodeError:
+                _logger.error(f"Invalid JSON in filter parameters for filter ID {record.id}")
+                parameters = {}
+            search_query = parameters.get('search', '') if isinstance(parameters, dict) else ''
+            domain = Product._get_item_list_domain(search_query, parameters if isinstance(parameters, dict) else {})
+            record.compiled_domain = json.dumps(domain)
+
+    def _get_domain(self):
+        """The compiled product.template domain of this filter"""
+        self.ensure_one()
+        return json.loads(self.compiled_domain or '[]')
@@ -0,0 +1,140 @@
+from odoo import api, fields, models
+from odoo.exceptions import ConcurrencyError
+from .item_importer import IMPORT_CHUNK_SIZE
+import base64
+import io
+import json
+import logging
+
+_logger = logging.getLogger(__name__)
+
+class ImportJob(models.Model):
+    """
+    Queued item import of an uploaded file.
+
+    Jobs are processed by a cron in chunks of IMPORT_CHUNK_SIZE rows, each
+    chunk committed with the counters and the cursor (number of rows
+    done), so a job interrupted by a crash or a time limit resumes after
+    its last committed chunk on the next run.
+    """
+    _name = 'kiss_pos.import_job'
+    _description = 'Item Import Job'
+    _order = 'id desc'
+
+    name = fields.Char(string='File Name', required=True)
+    user_id = fields.Many2one('res.users', string='User', required=True, default=lambda self: self.env.user)
+    file = fields.Binary(string='File', attachment=True, required=True)
+    state = fields.Selection([
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='State', default='queued', required=True, index=True)
+    row_count = fields.Integer(string='Rows', help="Number of data rows in the file")
+    cursor = fields.Integer(string='Cursor', help="Number of rows already imported")
+    created = fields.Integer(string='Created')
+    updated = fields.Integer(string='Updated')
+    skipped = fields.Integer(string='Skipped')
+    failed = fields.Integer(string='Failed')
+    errors = fields.Text(string='Row Errors', help="JSON list of the first row errors")
+    error = fields.Text(string='Error', help="Reason the whole job failed")
+    started_at = fields.Datetime(string='Started At')
+    finished_at = fields.Datetime(string='Finished At')
+
+    @api.model
+    def _enqueue(self, file, filename):
+        """Create the job of an uploaded file and wake up the import cron"""
+        data = file.read()
+        Importer = self.env['kiss_pos.item_importer']
+        # Parsing the file once validates its columns before it is queued
+        row_count = sum(1 for row in Importer._iter_rows(io.BytesIO(data), filename))
+        job = self.create({
+            'name': filename,
+            'file': base64.b64encode(data),
+            'row_count': row_count,
+        })
+        self.env.ref('kiss_pos.ir_cron_process_import_jobs')._trigger()
+        return job
+
+    @api.model
+    def _cron_process_import_jobs(self):
+        # Jobs still running when the cron starts were interrupted
+        for job in self.search([('state', 'in', ('queued', 'running'))], order='id'):
+            job._process()
+
+    def _process(self):
+        """Import the rows of the job after its cursor, committing every chunk"""
+        self.ensure_one()
+        cr = self.env.cr
+        self.write({'state': 'running', 'started_at': self.started_at or fields.Datetime.now()})
+        cr.commit()
+
+        try:
+            Importer = self.env['kiss_pos.item_importer']
+            rows = Importer._iter_rows(io.BytesIO(base64.b64decode(self.file)), self.name)
+            chunk = []
+            for row_number, row in enumerate(rows, start=2):
+                if row_number - 2 < self.cursor:
+                    continue
+                chunk.append((row_number, row))
+                if len(chunk) >= IMPORT_CHUNK_SIZE:
+                    self._process_chunk(chunk)
+                    chunk = []
+            if chunk:
+                self._process_chunk(chunk)
+            self.write({'state': 'done', 'finished_at': fields.Datetime.now()})
+        except ConcurrencyError:
+            # The job stays running and resumes after its last chunk
+            cr.rollback()
+            self.env.ref('kiss_pos.ir_cron_process_import_jobs')._trigger()
+            cr.commit()
+            return
+        except Exception as e:
+            cr.rollback()
+            _logger.error(f"Import job {self.id} ({self.name}) failed: {str(e)}")
+            self.write({'state': 'failed', 'error': str(e), 'finished_at': fields.Datetime.now()})
+        cr.commit()
+
+    def _process_chunk(self, chunk):
+        result = {
+            'total': self.cursor,
+            'created': self.created,
+            'updated': self.updated,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'errors': json.loads(self.errors or '[]'),
+        }
+        self.env['kiss_pos.item_importer']._import_chunk(chunk, result)
+        self.write({
+            'cursor': result['total'],
+            'created': result['created'],
+            'updated': result['updated'],
+            'skipped': result['skipped'],
+            'failed': result['failed'],
+            'errors': json.dumps(result['errors']),
+        })
+        self.env.cr.commit()
+        self.env.invalidate_all()
+
+    def _get_progress(self):
+        """Progress report of the job for the import_jobs API"""
+        self.ensure_one()
+        end = self.finished_at or fields.Datetime.now()
+        elapsed = (end - self.started_at).total_seconds() if self.started_at else 0
+        return {
+            'id': self.id,
+            'name': self.name,
+            'state': self.state,
+            'row_count': self.row_count,
+            'processed': self.cursor,
+            'created': self.created,
+            'updated': self.updated,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'progress': round(100.0 * self.cursor / self.row_count, 1) if self.row_count else 100.0,
+            'throughput': round(self.cursor / elapsed, 1) if elapsed else 0.0,
+            'errors': json.loads(self.errors or '[]'),
+            'error': self.error or None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
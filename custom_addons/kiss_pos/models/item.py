@@ -1,4 +1,197 @@
-from odoo import models, fields
+from odoo import api, models, fields
+from odoo.exceptions import ConcurrencyError
+from odoo.tools import SQL
+from odoo.tools.sql import column_exists, create_column, create_index
+import logging
+import psycopg2
+import re
+import time
+from .barcode_index import CATALOG_FIELDS, notify_catalog_change
+from .item_list_cache import item_list_cache
+
+_logger = logging.getLogger(__name__)
+
+# Resolutions exposed in the item list ``image_urls``
+ITEM_IMAGE_SIZES = ['image_1920', 'image_1024', 'image_512', 'image_256', 'image_128']
+
+
+def create_trigram_indexes(cr, table, indexes):
+    """
+    Create GIN trigram indexes backing (i)like substring searches.
+
+    ``indexes`` maps index names to ``(column, expression)``. The pg_trgm
+    extension is installed when missing and the database user is allowed to;
+    columns that already have a trigram index (e.g. declared by Odoo itself)
+    are skipped.
+    """
+    cr.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+    if not cr.fetchone():
+        try:
+            with cr.savepoint(flush=False):
+                cr.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except psycopg2.Error:
+            _logger.warning(f"pg_trgm is not available, substring searches on {table} will not be indexed")
+            return
+
+    cr.execute("SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s", (table,))
+    existing = cr.fetchall()
+    for index_name, (column, expression) in indexes.items():
+        if any(name == index_name or ('gin_trgm_ops' in indexdef and column in indexdef) for name, indexdef in existing):
+            continue
+        create_index(cr, index_name, table, [f"{expression} gin_trgm_ops"], method='gin')
+
+
+def _value(fname, default=None):
+    return (fname,), lambda row, names: row.get(fname, default)
+
+
+def _value_or(fname, default):
+    return (fname,), lambda row, names: row.get(fname) or default
+
+
+def _m2o_id(fname):
+    return (fname,), lambda row, names: row.get(fname) or None
+
+
+def _m2o_name(fname, default=None):
+    return (fname,), lambda row, names: names[fname].get(row[fname], default) if row.get(fname) else default
+
+
+def _date(fname):
+    return (fname,), lambda row, names: row[fname].strftime('%m/%d/%y') if row.get(fname) else None
+
+
+# Exclusion constraint of product_product keeping one product per barcode
+# and company, a product without company conflicting with every company
+BARCODE_UNIQUE_CONSTRAINT = 'product_product_kiss_barcode_company_excl'
+
+# Fields feeding product_template.kiss_search_vector
+SEARCH_VECTOR_FIELDS = {'name', 'default_code', 'barcode', 'feed_brand_id', 'categ_id', 'color_name'}
+
+# Weighted document of the ranked item search: name and codes first, then
+# brand, category and color. Translated names contribute every language.
+SEARCH_VECTOR_SQL = """
+    UPDATE product_template pt
+    SET kiss_search_vector =
+        setweight(to_tsvector('simple', jsonb_path_query_array(pt.name, '$.*')::text), 'A')
+        || setweight(to_tsvector('simple', concat_ws(' ', pt.default_code, (
+            SELECT string_agg(concat_ws(' ', pp.barcode, pp.default_code), ' ')
+            FROM product_product pp WHERE pp.product_tmpl_id = pt.id
+        ))), 'A')
+        || setweight(to_tsvector('simple', COALESCE({brand_name}, '')), 'B')
+        || setweight(to_tsvector('simple', COALESCE((
+            SELECT pc.name FROM product_category pc WHERE pc.id = pt.categ_id
+        ), '')), 'C')
+        || setweight(to_tsvector('simple', COALESCE(pt.color_name, '')), 'D')
+    WHERE {where}
+"""
+
+
+def _coalesce(fname, default):
+    return lambda model: SQL("COALESCE(%s, %s)", SQL.identifier(model._table, fname), default)
+
+
+def _translated(fname):
+    def expression(model):
+        column = SQL.identifier(model._table, fname)
+        lang = model.env.lang
+        if not model._fields[fname].translate:
+            return SQL("COALESCE(%s, '')", column)
+        if not lang or lang == 'en_US':
+            return SQL("COALESCE(%s->>'en_US', '')", column)
+        return SQL("COALESCE(%s->>%s, %s->>'en_US', '')", column, lang, column)
+    return expression
+
+
+# Sortable item list keys -> SQL sort expression of a model, None meaning
+# id only. Empty values sort as 0 / '' so that keyset comparisons stay
+# total; the expressions match the (expression, id) indexes created by the
+# init() of product.template and of the item list read model.
+ITEM_LIST_ORDERS = {
+    'id': None,
+    'name': _translated('name'),
+    'unit_price': _coalesce('list_price', 0),
+    'status': _coalesce('item_status', ''),
+    'on_hand': _coalesce('on_hand', 0),
+    'modified_date': lambda model: SQL.identifier(model._table, 'write_date'),
+}
+
+
+def search_keyset(model, domain, order='id', descending=True, after=None, limit=None, fnames=()):
+    """
+    Return ``[(id, sort value, *fnames)]`` of the records of model matching
+    domain, ordered by the ITEM_LIST_ORDERS key then id, starting after the
+    ``(value, id)`` position ``after`` of a previous page.
+    """
+    id_sql = SQL.identifier(model._table, 'id')
+    key_sql = ITEM_LIST_ORDERS[order](model) if ITEM_LIST_ORDERS[order] else id_sql
+    direction = SQL("DESC") if descending else SQL("ASC")
+
+    model.env.flush_all()
+    query = model._search(domain)
+    if after:
+        value, last_id = after
+        operator = SQL("<") if descending else SQL(">")
+        query.add_where(SQL("(%s, %s) %s (%s, %s)", key_sql, id_sql, operator, value, last_id))
+    query.order = SQL("%s %s, %s %s", key_sql, direction, id_sql, direction)
+    query.limit = limit
+    model.env.cr.execute(query.select(id_sql, key_sql, *(SQL.identifier(model._table, fname) for fname in fnames)))
+    return model.env.cr.fetchall()
+
+
+# Item list columns: output key -> (product.template fields read, getter).
+# Getters receive the raw ``read(load=None)`` row and the names of the
+# many2one values keyed by field name.
+ITEM_LIST_COLUMNS = {
+    "id": _value('id'),
+    "name": _value('name'),
+    "barcode": (('barcode',), lambda row, names: row.get('barcode') or f"INV{row['id']}"),
+    "sku": (('default_code',), lambda row, names: row.get('default_code') or f"SKU1234567890{row['id']}"),
+    "unit_price": (('list_price',), lambda row, names: f"${row['list_price'] or 0.0:.2f}"),
+    "category": _m2o_name('categ_id', "Uncategorized"),
+    "company": _m2o_name('company_id', "N/A"),
+    "supplier": _m2o_name('vendor1_id', "N/A"),
+    "status": _value_or('item_status', "Not Confirmed"),
+    "created_by": _m2o_name('create_uid'),
+    "created_date": _date('create_date'),
+    "modified_by": _m2o_name('write_uid'),
+    "modified_date": _date('write_date'),
+    "parent_id": _m2o_id('categ_id'),
+    "cost": _value('standard_price'),
+    "tax_code": _value('tax_code'),
+    "msrp": _value('msrp'),
+    "parent_company": _m2o_name('parent_company_id'),
+    "parent_company_id": _m2o_id('parent_company_id'),
+    "brand": _m2o_name('feed_brand_id', "N/A"),
+    "feed_brand_id": _m2o_id('feed_brand_id'),
+    "on_hand": _value('on_hand', 0),
+    "age_restriction": _value('age_restriction', False),
+    "use_ebt": _value('use_ebt', False),
+    "volume": _value('volume'),
+    "weight": _value('weight'),
+    "vendor1_id": _m2o_id('vendor1_id'),
+    "vendor2_id": _m2o_id('vendor2_id'),
+    "secondary_supplier": _m2o_name('vendor2_id'),
+    "item_type": _value('type'),
+    "item_unit": _value('item_unit'),
+    "packaging_type": _value('packaging_type'),
+    "srs_category": _value('srs_category'),
+    "inventory_tracking": _value('inventory_tracking', True),
+    "in_transit": _value('in_transit', 0),
+    "reorder_point": _value('reorder_point', 0),
+    "restock_level": _value('restock_level', 0),
+    "min_order_qty": _value('min_order_qty', 0),
+    "color": _value('color_name'),
+    "size": _value('size'),
+    "dimension": _value('dimension'),
+    "image_urls": (('write_date',), None),
+}
+
+# Overrides of ITEM_LIST_COLUMNS for machine-oriented formats, which carry
+# plain numbers instead of display strings
+ITEM_LIST_RAW_COLUMNS = {
+    "unit_price": _value('list_price'),
+}
 
 class ProductTemplate(models.Model):
     _inherit = 'product.template'
@@ -44,4 +237,357 @@ class ProductTemplate(models.Model):
     age_restriction = fields.Boolean(string='Age Restriction', default=False,
                                     help="Whether this product has age restrictions")
     use_ebt = fields.Boolean(string='Use EBT', default=False,
-                             help="Whether this product is eligible for EBT")
\ No newline at end of file
+                             help="Whether this product is eligible for EBT")
+
+    def init(self):
+        super().init()
+        # Item list and typeahead searches match name and SKU by substring;
+        # translated names are searched through their jsonb values.
+        create_trigram_indexes(self.env.cr, self._table, {
+            'product_template_name_trgm_idx': ('name', "(jsonb_path_query_array(name, '$.*')::text)"),
+            'product_template_default_code_trgm_idx': ('default_code', "default_code"),
+        })
+
+        # Keyset pagination indexes for the sortable item list keys
+        cr = self.env.cr
+        for index_name, expression in [
+            ('product_template_kiss_name_id_idx', "(COALESCE(name->>'en_US', ''))"),
+            ('product_template_kiss_list_price_id_idx', "(COALESCE(list_price, 0))"),
+            ('product_template_kiss_item_status_id_idx', "(COALESCE(item_status, ''))"),
+            ('product_template_kiss_on_hand_id_idx', "(COALESCE(on_hand, 0))"),
+            ('product_template_kiss_write_date_id_idx', "write_date"),
+        ]:
+            create_index(cr, index_name, self._table, [expression, 'id'])
+
+        # Full-text document of the ranked item search, maintained on write
+        if not column_exists(cr, self._table, 'kiss_search_vector'):
+            create_column(cr, self._table, 'kiss_search_vector', 'tsvector')
+        create_index(cr, 'product_template_kiss_search_vector_idx', self._table, ['kiss_search_vector'], method='gin')
+        cr.execute(self._get_search_vector_sql("pt.kiss_search_vector IS NULL"))
+
+        # MAX(write_date) of the tables the list validators follow (see
+        # compute_etag()) as a backward index scan
+        related_models = self._get_item_list_comodels() | {'res.partner', 'res.users', 'res.company', 'stock.quant'}
+        for table in sorted({self.env[name]._table for name in related_models if name in self.env}):
+            create_index(cr, f'{table}_kiss_write_date_idx', table, ['write_date'])
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        item_list_cache.clear(self.env.cr.dbname)
+        products = super().create(vals_list)
+        products._update_search_vector()
+        self.env['kiss_pos.item_list_row']._schedule_refresh(products.ids)
+        notify_catalog_change(self.env)
+        return products
+
+    def write(self, vals):
+        item_list_cache.clear(self.env.cr.dbname)
+        if 'active' in vals and not vals['active']:
+            self.env['kiss_pos.item_tombstone']._record(self.filtered('active').ids, 'archived')
+        res = super().write(vals)
+        if SEARCH_VECTOR_FIELDS.intersection(vals):
+            self._update_search_vector()
+        self.env['kiss_pos.item_list_row']._schedule_refresh(self.ids)
+        if CATALOG_FIELDS.intersection(vals):
+            notify_catalog_change(self.env)
+        return res
+
+    def unlink(self):
+        item_list_cache.clear(self.env.cr.dbname)
+        self.env['kiss_pos.item_tombstone']._record(self.ids, 'deleted')
+        self.env['kiss_pos.item_list_row']._schedule_refresh(self.ids)
+        notify_catalog_change(self.env)
+        return super().unlink()
+
+    @api.model
+    def _get_item_list_domain(self, search_query, filters):
+        """
+        Build the template domain of the item list filters: the posted
+        item list body or the parameters of a saved custom.filter.
+        """
+        domain = []
+        
+        # Filter by name, SKU or barcode search query (trigram indexed)
+        if search_query and search_query.strip():
+            _logger.info(f"Entered If Search query: {search_query.strip()}")
+            domain += ['|', '|',
+                       ('name', 'ilike', search_query.strip()),
+                       ('default_code', 'ilike', search_query.strip()),
+                       ('barcode', 'ilike', search_query.strip())]
+        
+        # Filter by price range
+        price_range = filters.get('price_range')
+        if price_range:
+            if 'min_price' in price_range:
+                domain.append(('list_price', '>=', float(price_range['min_price'])))
+            if 'max_price' in price_range:
+                domain.append(('list_price', '<=', float(price_range['max_price'])))
+
+        # Filter by brands
+        brands = filters.get('brands')
+        if brands:
+            domain.append(('feed_brand_id', 'in', brands))
+        
+        # Filter by item type
+        item_types = filters.get('item_type')
+        if item_types:
+            domain.append(('type', 'in', item_types))
+        
+        # Filter by item unit
+        item_units = filters.get('item_unit')
+        if item_units:
+            domain.append(('item_unit', 'in', item_units))
+        
+        # Filter by category
+        categories = filters.get('categories')
+        if categories:
+            domain.append(('categ_id', 'in', categories))
+        
+        # Filter by suppliers
+        suppliers = filters.get('suppliers')
+        if suppliers:
+            domain.append(('vendor1_id', 'in', suppliers))
+            domain.append(('vendor2_id', 'in', suppliers))
+        
+        # Filter by tax code
+        tax_codes = filters.get('tax_codes')
+        if tax_codes:
+            domain.append(('tax_code', 'in', tax_codes))
+
+        return domain
+
+    @api.model
+    def _get_search_vector_sql(self, where):
+        brand_name = "NULL"
+        if 'feed_brand_id' in self._fields:
+            brand_name = """(
+                SELECT jsonb_path_query_array(b.name, '$.*')::text
+                FROM product_data_feed_brand b WHERE b.id = pt.feed_brand_id
+            )"""
+        return SEARCH_VECTOR_SQL.format(brand_name=brand_name, where=where)
+
+    def _update_search_vector(self):
+        """Recompute the full-text document of these templates"""
+        if not self.ids:
+            return
+        self.env.flush_all()
+        self.env.cr.execute(self._get_search_vector_sql("pt.id = ANY(%s)"), (list(self.ids),))
+
+    @api.model
+    def _search_ranked(self, query, domain=None, limit=None):
+        """
+        Return the ids of the templates matching the words of query within
+        domain, best match first. Every word is matched as a prefix, so
+        partial barcodes and names are found while typing.
+        """
+        tsquery = self._get_search_tsquery(query)
+        if not tsquery:
+            return []
+        vector = SQL.identifier(self._table, 'kiss_search_vector')
+        rank = SQL("ts_rank_cd(%s, to_tsquery('simple', %s))", vector, tsquery)
+
+        self.env.flush_all()
+        search_query = self._search(domain or [])
+        search_query.add_where(SQL("%s @@ to_tsquery('simple', %s)", vector, tsquery))
+        search_query.order = SQL("%s DESC, %s DESC", rank, SQL.identifier(self._table, 'id'))
+        search_query.limit = limit
+        self.env.cr.execute(search_query.select(SQL.identifier(self._table, 'id')))
+        return [row[0] for row in self.env.cr.fetchall()]
+
+    @api.model
+    def _get_search_tsquery(self, query):
+        """Prefix tsquery of the words of query for the ranked item search, None without words"""
+        words = re.findall(r'\w+', query or '')
+        return ' & '.join(f"{word}:*" for word in words) if words else None
+
+    @api.model
+    def _search_keyset(self, domain, order='id', descending=True, after=None, limit=None):
+        """Return ``[(id, sort value)]`` of the templates matching domain, see search_keyset()"""
+        return search_keyset(self, domain, order, descending, after, limit)
+
+    @api.model
+    def _upsert_by_barcode(self, vals_list, update_vals_list=None):
+        """
+        Create or update templates keyed on their barcode and company,
+        returning ``[(template, created)]`` aligned with vals_list. Existing
+        templates are written with ``update_vals_list`` when given, so that
+        the defaults of new rows do not overwrite their values.
+
+        Existing templates are found with one query and written, the others
+        created with one create() call; rows repeating a barcode of the
+        batch update the template created for the first one. Rows without
+        barcode are always created. As for Odoo's barcode check, a product
+        without company matches the barcode in every company, and a row
+        without company matches the product of any company. The barcode
+        constraint of product_product rejects the creations that lost a
+        race against another transaction; as that transaction's items
+        cannot be seen from this one, a ConcurrencyError is raised for
+        Odoo to retry the whole request, which then updates them.
+        """
+        def key(vals):
+            return vals['barcode'], vals.get('company_id') or False
+
+        existing = self._find_by_barcode({key(vals) for vals in vals_list if vals.get('barcode')})
+        results = [None] * len(vals_list)
+        created_by_key = {}
+        to_create = []
+        to_update = []
+        for index, vals in enumerate(vals_list):
+            if not vals.get('barcode'):
+                to_create.append(index)
+            elif key(vals) in existing:
+                to_update.append((index, existing[key(vals)]))
+            elif key(vals) in created_by_key:
+                to_update.append((index, None))
+            else:
+                created_by_key[key(vals)] = index
+                to_create.append(index)
+
+        try:
+            with self.env.cr.savepoint():
+                templates = self.create([vals_list[index] for index in to_create])
+        except psycopg2.IntegrityError as e:
+            if e.diag.constraint_name != BARCODE_UNIQUE_CONSTRAINT:
+                raise
+            raise ConcurrencyError("Barcodes created by a concurrent transaction") from e
+        for index, template in zip(to_create, templates):
+            results[index] = (template, True)
+
+        for index, template in to_update:
+            template = template or results[created_by_key[key(vals_list[index])]][0]
+            template.write(update_vals_list[index] if update_vals_list else vals_list[index])
+            results[index] = results[index] or (template, False)
+        return results
+
+    @api.model
+    def _find_by_barcode(self, keys):
+        """
+        Map ``(barcode, company id)`` keys to the templates of the variants
+        holding them: the variant of that company, else a variant without
+        company, else (for keys without company) one of any company
+        """
+        if not keys:
+            return {}
+        variants = self.env['product.product'].sudo().with_context(active_test=False).search([
+            ('barcode', 'in', list({barcode for barcode, company_id in keys})),
+        ], order='id')
+        by_barcode = {}
+        for variant in variants:
+            by_barcode.setdefault(variant.barcode, []).append(variant)
+
+        result = {}
+        for barcode, company_id in keys:
+            candidates = by_barcode.get(barcode, [])
+            match = (
+                next((v for v in candidates if company_id and v.company_id.id == company_id), None)
+                or next((v for v in candidates if not v.company_id), None)
+                or next((v for v in candidates if not company_id), None)
+            )
+            if match:
+                result[barcode, company_id] = match.product_tmpl_id.with_env(self.env)
+        return result
+
+    def _get_ids_with_images(self):
+        """Return the ids of these templates that have at least one image attachment"""
+        if not self.ids:
+            return set()
+        self.env.cr.execute("""
+            SELECT DISTINCT res_id
+            FROM ir_attachment
+            WHERE res_model = 'product.template'
+            AND res_field LIKE 'image_%%'
+            AND res_id = ANY(%s)
+        """, (list(self.ids),))
+        return {row[0] for row in self.env.cr.fetchall()}
+
+    def _get_item_list_comodels(self):
+        """
+        Models whose records feed the item list payload besides the
+        templates: those named in it, and the variants, whose cost, barcode
+        and code changes do not touch the template's write_date
+        """
+        return {
+            self._fields[fname].comodel_name
+            for fnames, getter in ITEM_LIST_COLUMNS.values()
+            for fname in fnames
+            if fname in self._fields and self._fields[fname].type == 'many2one'
+        } | {'product.product'}
+
+    @api.model
+    def _get_item_list_columns(self, columns=None):
+        """The known item list keys among columns (all by default), id first"""
+        columns = [c for c in (columns or ITEM_LIST_COLUMNS) if c in ITEM_LIST_COLUMNS]
+        if 'id' not in columns:
+            columns.insert(0, 'id')
+        return columns
+
+    def _get_item_list_data(self, columns=None, raw=False):
+        """Serialize the templates for the item list API.
+
+        Only the fields backing the requested ``columns`` (all of
+        ITEM_LIST_COLUMNS by default) are read, and many2one names are
+        resolved with one read per comodel instead of per record. With
+        ``raw`` prices are returned as numbers instead of display strings.
+        """
+        spec = dict(ITEM_LIST_COLUMNS, **ITEM_LIST_RAW_COLUMNS) if raw else ITEM_LIST_COLUMNS
+        columns = self._get_item_list_columns(columns)
+
+        fnames = {
+            fname
+            for column in columns
+            for fname in spec[column][0]
+            if fname in self._fields
+        }
+        rows = self.read(list(fnames), load=None)
+
+        # Batch the many2one name lookups per comodel
+        m2o_fields = [fname for fname in fnames if self._fields[fname].type == 'many2one']
+        ids_by_model = {}
+        for fname in m2o_fields:
+            comodel = self._fields[fname].comodel_name
+            ids_by_model.setdefault(comodel, set()).update(row[fname] for row in rows if row[fname])
+        names_by_model = {
+            comodel: {rec['id']: rec['name'] for rec in self.env[comodel].browse(list(ids)).read(['name'])}
+            for comodel, ids in ids_by_model.items()
+        }
+        names = {fname: names_by_model[self._fields[fname].comodel_name] for fname in m2o_fields}
+
+        ids_with_images = self._get_ids_with_images() if 'image_urls' in columns else set()
+
+        result = []
+        for row in rows:
+            item_data = {}
+            for column in columns:
+                if column == 'image_urls':
+                    # Generate image URLs for all available resolutions, only when images exist
+                    image_urls = {}
+                    if row['id'] in ids_with_images:
+                        write_date = row.get('write_date')
+                        timestamp = int(write_date.timestamp() * 1000) if write_date else int(time.time() * 1000)
+                        image_urls = {
+                            size: f'/web/image/product.template/{row["id"]}/{size}?unique={timestamp}'
+                            for size in ITEM_IMAGE_SIZES
+                        }
+                    item_data[column] = image_urls
+                else:
+                    item_data[column] = spec[column][1](row, names)
+            result.append(item_data)
+        return result
+
+    def _iter_item_batches(self, domain, batch_size):
+        """Yield the templates matching domain by id desc, batch_size records at a time.
+
+        Batches are fetched with a keyset on id and the environment cache is
+        cleared between them, so memory stays bounded by the batch size.
+        """
+        last_id = None
+        while True:
+            batch_domain = domain + [('id', '<', last_id)] if last_id else domain
+            items = self.search(batch_domain, order="id desc", limit=batch_size)
+            if not items:
+                return
+            last_id = items[-1].id
+            yield items
+            if len(items) < batch_size:
+                return
+            self.env.invalidate_all()
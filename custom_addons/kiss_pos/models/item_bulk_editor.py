@@ -0,0 +1,168 @@
+from odoo import api, models
+from odoo.tools import SQL, float_round
+import logging
+from .barcode_index import CATALOG_FIELDS, notify_catalog_change
+from .item import SEARCH_VECTOR_FIELDS
+from .item_list_cache import item_list_cache
+
+_logger = logging.getLogger(__name__)
+
+# Bulk edit field keys of the item list -> product.template field
+BULK_EDIT_FIELDS = {
+    'item': 'name',
+    'price': 'list_price',
+    'status': 'item_status',
+    'cost': 'standard_price',
+    'msrp': 'msrp',
+    'brand': 'feed_brand_id',
+    'size': 'size',
+    'dimension': 'dimension',
+    'item_unit': 'item_unit',
+    'packaging_type': 'packaging_type',
+    'srs_category': 'srs_category',
+    'color_name': 'color_name',
+    'on_hand': 'on_hand',
+    'inventory_tracking': 'inventory_tracking',
+    'in_transit': 'in_transit',
+    'reorder_point': 'reorder_point',
+    'restock_level': 'restock_level',
+    'min_order_qty': 'min_order_qty',
+    'age_restriction': 'age_restriction',
+    'use_ebt': 'use_ebt',
+    'vendor1_id': 'vendor1_id',
+    'vendor2_id': 'vendor2_id',
+    'categ_id': 'categ_id',
+    'item_type': 'type',
+    'weight': 'weight',
+    'volume': 'volume',
+    'sku': 'default_code',
+    'tax_code': 'tax_code',
+}
+
+# Plain columns nothing else is computed from, updated with a single SQL
+# statement. The other fields (translated, company dependent, computed
+# from the variants or with stored dependents) are written through the ORM.
+BULK_EDIT_SQL_FIELDS = {
+    'list_price', 'item_status', 'msrp', 'size', 'dimension', 'item_unit', 'packaging_type',
+    'srs_category', 'color_name', 'on_hand', 'inventory_tracking', 'in_transit', 'reorder_point',
+    'restock_level', 'min_order_qty', 'age_restriction', 'use_ebt', 'vendor1_id', 'vendor2_id',
+    'tax_code',
+}
+
+BULK_EDIT_OPERATIONS = ('set', 'increase', 'decrease')
+BULK_EDIT_UNITS = ('%', 'absolute')
+
+class ItemBulkEditor(models.AbstractModel):
+    """
+    Set-based bulk edit of one item field.
+
+    ``set`` assigns the same value to every item, ``increase`` and
+    ``decrease`` change numeric fields by a percentage or an absolute
+    amount of their current value. Categories and suppliers can be set by
+    name, unknown names being created.
+    """
+    _name = 'kiss_pos.item_bulk_editor'
+    _description = 'Item Bulk Editor'
+
+    @api.model
+    def _bulk_edit(self, domain, key, operation, value, unit='absolute'):
+        """Apply the edit to the templates matching domain, returning the number of items changed"""
+        Product = self.env['product.template'].sudo()
+        fname = BULK_EDIT_FIELDS.get(key)
+        if not fname or fname not in Product._fields:
+            raise ValueError(f"Field '{key}' cannot be bulk edited")
+        if operation not in BULK_EDIT_OPERATIONS or unit not in BULK_EDIT_UNITS:
+            raise ValueError(f"Invalid operation '{operation}' or unit '{unit}'")
+        field = Product._fields[fname]
+        if operation != 'set' and field.type not in ('float', 'integer', 'monetary'):
+            raise ValueError(f"Field '{key}' is not numeric")
+        value = self._convert_value(field, value, operation)
+
+        item_list_cache.clear(self.env.cr.dbname)
+        if fname in BULK_EDIT_SQL_FIELDS:
+            ids = self._bulk_edit_sql(Product, domain, field, operation, value, unit)
+        else:
+            ids = self._bulk_edit_orm(Product, domain, field, operation, value, unit)
+        _logger.info(f"Bulk edited {fname} of {len(ids)} items ({operation} {value} {unit})")
+        return len(ids)
+
+    @api.model
+    def _convert_value(self, field, value, operation):
+        """Coerce a posted value to the type of field"""
+        if operation != 'set' or field.type in ('float', 'monetary'):
+            return float(value)
+        if field.type == 'integer':
+            return int(value)
+        if field.type == 'boolean':
+            return value in (True, 1, '1', 'true', 'True')
+        if field.type == 'many2one':
+            if not value:
+                return None
+            if isinstance(value, int) or str(value).strip().isdigit():
+                return int(value)
+            # Categories and suppliers may be given by name
+            name = str(value).strip()
+            return self.env['kiss_pos.name_resolver']._resolve(field.comodel_name, [name])[name]
+        return value
+
+    @api.model
+    def _get_new_value(self, field, current, operation, value, unit):
+        """Value of a numeric field after an increase or decrease"""
+        current = current or 0.0
+        change = current * value / 100 if unit == '%' else value
+        new_value = current + change if operation == 'increase' else current - change
+        if field.type == 'integer':
+            return round(new_value)
+        digits = field.get_digits(self.env) if field.type == 'float' else None
+        return float_round(new_value, precision_digits=digits[1]) if digits else new_value
+
+    @api.model
+    def _bulk_edit_sql(self, Product, domain, field, operation, value, unit):
+        """Update a plain column with one UPDATE statement, returning the ids changed"""
+        column = SQL.identifier(field.name)
+        if operation == 'set':
+            expression = SQL("%s", value)
+        else:
+            current = SQL("COALESCE(%s, 0)", column)
+            sign = 1 if operation == 'increase' else -1
+            if unit == '%':
+                expression = SQL("%s * %s", current, 1 + sign * value / 100)
+            else:
+                expression = SQL("%s + %s", current, sign * value)
+            digits = field.get_digits(self.env) if field.type == 'float' else None
+            if digits:
+                expression = SQL("ROUND((%s)::numeric, %s)", expression, digits[1])
+
+        self.env.flush_all()
+        query = Product._search(domain)
+        self.env.cr.execute(SQL(
+            "UPDATE %s SET %s = %s, write_uid = %s, write_date = %s WHERE id IN %s RETURNING id",
+            SQL.identifier(Product._table), column, expression, self.env.uid, self.env.cr.now(),
+            query.subselect(),
+        ))
+        ids = [row[0] for row in self.env.cr.fetchall()]
+        Product.invalidate_model([field.name, 'write_uid', 'write_date'])
+
+        # What the product.template write() hooks would have done
+        if field.name in SEARCH_VECTOR_FIELDS:
+            Product.browse(ids)._update_search_vector()
+        self.env['kiss_pos.item_list_row']._schedule_refresh(ids)
+        if field.name in CATALOG_FIELDS:
+            notify_catalog_change(self.env)
+        return ids
+
+    @api.model
+    def _bulk_edit_orm(self, Product, domain, field, operation, value, unit):
+        """Write a field through the ORM with one write per distinct new value, returning the ids changed"""
+        products = Product.search(domain)
+        if operation == 'set':
+            products.write({field.name: value})
+            return products.ids
+
+        ids_by_value = {}
+        for product in products:
+            new_value = self._get_new_value(field, product[field.name], operation, value, unit)
+            ids_by_value.setdefault(new_value, []).append(product.id)
+        for new_value, ids in ids_by_value.items():
+            Product.browse(ids).write({field.name: new_value})
+        return products.ids
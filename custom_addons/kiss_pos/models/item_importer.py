@@ -0,0 +1,221 @@
+from odoo import api, models
+from odoo.exceptions import ConcurrencyError
+from odoo.tools import float_compare, html2plaintext
+import csv
+import io
+import logging
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+_logger = logging.getLogger(__name__)
+
+# Rows matched, diffed and written together
+IMPORT_CHUNK_SIZE = 500
+
+# Row errors reported back to the client, the others are only counted
+IMPORT_MAX_ERRORS = 100
+
+# Import file columns that must be present and filled in on every row
+IMPORT_REQUIRED_COLUMNS = ['item_name', 'sku', 'description', 'barcode', 'selling_price']
+
+# Import file column -> product.template field
+IMPORT_FIELDS = {
+    'item_name': 'name',
+    'sku': 'default_code',
+    'barcode': 'barcode',
+    'description': 'description',
+    'selling_price': 'list_price',
+}
+
+# Optional import file columns holding record names -> (product.template
+# field, model resolved by name)
+IMPORT_NAME_FIELDS = {
+    'category': ('categ_id', 'product.category'),
+    'vendor1_id': ('vendor1_id', 'res.partner'),
+    'vendor2_id': ('vendor2_id', 'res.partner'),
+}
+
+class ItemImporter(models.AbstractModel):
+    """
+    Streaming CSV/XLSX item import.
+
+    The file is read one row at a time and processed in chunks: the
+    existing items of a chunk are found with one barcode query, rows whose
+    values did not change are skipped by comparing them in memory, new
+    items are created with one create() call and changed ones written.
+    Items sharing a barcode are all updated. Category and supplier names
+    are resolved once per chunk, unknown ones being created.
+    """
+    _name = 'kiss_pos.item_importer'
+    _description = 'Item Importer'
+
+    @api.model
+    def _iter_rows(self, file, filename):
+        """Yield the rows of an uploaded CSV or XLSX file as dicts keyed by column name"""
+        if filename.lower().endswith('.xlsx'):
+            if openpyxl is None:
+                raise ValueError("XLSX import is not available on this server")
+            workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+            try:
+                rows = workbook.active.iter_rows(values_only=True)
+                headers = [str(header).strip() if header is not None else '' for header in next(rows, ())]
+                self._check_headers(headers)
+                for values in rows:
+                    if any(value not in (None, '') for value in values):
+                        yield {
+                            header: '' if value is None else str(value).strip()
+                            for header, value in zip(headers, values)
+                        }
+            finally:
+                workbook.close()
+        elif filename.lower().endswith('.csv'):
+            reader = csv.DictReader(io.TextIOWrapper(file, encoding='utf-8-sig', newline=''))
+            headers = [header.strip() for header in reader.fieldnames or []]
+            reader.fieldnames = headers
+            self._check_headers(headers)
+            for row in reader:
+                if any(row.values()):
+                    yield {header: (value or '').strip() for header, value in row.items() if header}
+        else:
+            raise ValueError("Only CSV and XLSX files can be imported")
+
+    @api.model
+    def _check_headers(self, headers):
+        missing = [column for column in IMPORT_REQUIRED_COLUMNS if column not in headers]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    @api.model
+    def _import_file(self, file, filename):
+        """Import an uploaded file, returning the created/updated/skipped/failed counts and row errors"""
+        result = {'total': 0, 'created': 0, 'updated': 0, 'skipped': 0, 'failed': 0, 'errors': []}
+        chunk = []
+        for row_number, row in enumerate(self._iter_rows(file, filename), start=2):
+            chunk.append((row_number, row))
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                self._import_chunk(chunk, result)
+                chunk = []
+        if chunk:
+            self._import_chunk(chunk, result)
+        return result
+
+    @api.model
+    def _prepare_import_vals(self, row):
+        """product.template values of an import row, raising ValueError when it is incomplete"""
+        empty = [column for column in IMPORT_REQUIRED_COLUMNS if not row.get(column)]
+        if empty:
+            raise ValueError(f"Missing required data: {', '.join(empty)}")
+        vals = {fname: row[column] for column, fname in IMPORT_FIELDS.items() if column in row}
+        vals['list_price'] = float(vals['list_price'])
+        return vals
+
+    @api.model
+    def _is_unchanged(self, product, vals):
+        """Whether writing vals would leave the values of product (a read() dict) as they are"""
+        for fname, value in vals.items():
+            current = product.get(fname)
+            if fname == 'list_price':
+                if float_compare(current or 0.0, value, precision_digits=2):
+                    return False
+            elif fname == 'description':
+                if html2plaintext(current or '').strip() != value:
+                    return False
+            elif isinstance(value, int):
+                if current != value:
+                    return False
+            elif (current or '').strip() != value:
+                return False
+        return True
+
+    @api.model
+    def _import_chunk(self, chunk, result):
+        """Create or update the items of a list of ``(row number, row)``, adding to the result counts"""
+        Product = self.env['product.template'].sudo()
+        result['total'] += len(chunk)
+
+        rows = []
+        for row_number, row in chunk:
+            try:
+                rows.append((row_number, self._prepare_import_vals(row)))
+            except ValueError as e:
+                self._add_error(result, row_number, str(e))
+
+        # Category and supplier names resolve to ids with one query per model
+        Resolver = self.env['kiss_pos.name_resolver']
+        fnames = set(IMPORT_FIELDS.values())
+        chunk_rows = dict(chunk)
+        for column, (fname, model_name) in IMPORT_NAME_FIELDS.items():
+            names = [chunk_rows[row_number].get(column) for row_number, vals in rows]
+            if not any(names):
+                continue
+            ids = Resolver._resolve(model_name, names)
+            fnames.add(fname)
+            for (row_number, vals), name in zip(rows, names):
+                if name:
+                    vals[fname] = ids[name]
+
+        # One query for the items already holding the barcodes of the chunk
+        barcodes = list({vals['barcode'] for row_number, vals in rows})
+        existing = {}
+        for product in Product.search_read([('barcode', 'in', barcodes)], list(fnames), load=None):
+            existing.setdefault(product['barcode'], []).append(product)
+
+        to_create = []
+        to_write = []
+        for row_number, vals in rows:
+            products = existing.get(vals['barcode'])
+            if not products:
+                to_create.append((row_number, vals))
+                continue
+            changed = [product['id'] for product in products if not self._is_unchanged(product, vals)]
+            if changed:
+                to_write.append((row_number, changed, vals))
+            else:
+                result['skipped'] += 1
+
+        try:
+            with self.env.cr.savepoint():
+                # New barcodes are upserted, so that a barcode repeated in the
+                # file or imported concurrently does not create duplicates
+                upserted = Product._upsert_by_barcode([vals for row_number, vals in to_create])
+                for row_number, product_ids, vals in to_write:
+                    Product.browse(product_ids).write(vals)
+            created = sum(1 for template, is_new in upserted if is_new)
+            result['created'] += created
+            result['updated'] += len(to_write) + len(upserted) - created
+        except ConcurrencyError:
+            # Barcodes created concurrently are only visible to a new transaction
+            raise
+        except Exception as e:
+            # Retry row by row to only reject the failing ones
+            _logger.warning(f"Import chunk failed, retrying row by row: {str(e)}")
+            for row_number, vals in to_create:
+                self._apply_row(result, row_number, lambda: self._upsert_row(Product, vals))
+            for row_number, product_ids, vals in to_write:
+                self._apply_row(result, row_number, lambda: Product.browse(product_ids).write(vals) and 'updated')
+
+    @api.model
+    def _upsert_row(self, Product, vals):
+        template, is_new = Product._upsert_by_barcode([vals])[0]
+        return 'created' if is_new else 'updated'
+
+    @api.model
+    def _apply_row(self, result, row_number, operation):
+        """Run operation, which returns the name of the counter to increment, in its own savepoint"""
+        try:
+            with self.env.cr.savepoint():
+                counter = operation()
+            result[counter] += 1
+        except ConcurrencyError:
+            raise
+        except Exception as e:
+            self._add_error(result, row_number, str(e))
+
+    @api.model
+    def _add_error(self, result, row_number, error):
+        result['failed'] += 1
+        if len(result['errors']) < IMPORT_MAX_ERRORS:
+            result['errors'].append({'row': row_number, 'error': error})
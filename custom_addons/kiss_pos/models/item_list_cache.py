@@ -0,0 +1,82 @@
+from collections import OrderedDict
+import threading
+import time
+
+# Bounds of the per-database item list cache
+ITEM_LIST_CACHE_MAX_ENTRIES = 256
+ITEM_LIST_CACHE_MAX_BYTES = 64 * 1024 * 1024
+ITEM_LIST_CACHE_TTL = 300
+
+
+class ItemListCache:
+    """
+    Per-worker LRU of serialized item list responses, partitioned by database.
+
+    Each entry is stored with the validator it was computed under and is
+    only returned while the caller's current validator still matches, so
+    writes made by other workers invalidate it as well. Local writes clear
+    the database partition through the product.template hooks.
+    """
+
+    def __init__(self, max_entries=ITEM_LIST_CACHE_MAX_ENTRIES, max_bytes=ITEM_LIST_CACHE_MAX_BYTES,
+                 ttl=ITEM_LIST_CACHE_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._bytes = {}
+        self._hits = {}
+        self._misses = {}
+
+    def get(self, dbname, key, validator):
+        """Return the cached payload for key, or None if absent, stale or expired"""
+        with self._lock:
+            entries = self._entries.get(dbname)
+            entry = entries.get(key) if entries else None
+            if entry and entry[0] == validator and entry[1] > time.monotonic():
+                entries.move_to_end(key)
+                self._hits[dbname] = self._hits.get(dbname, 0) + 1
+                return entry[2]
+            if entry:
+                self._remove(dbname, key)
+            self._misses[dbname] = self._misses.get(dbname, 0) + 1
+            return None
+
+    def set(self, dbname, key, validator, payload):
+        """Store payload (bytes) for key, evicting least recently used entries past the bounds"""
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            entries = self._entries.setdefault(dbname, OrderedDict())
+            if key in entries:
+                self._remove(dbname, key)
+            entries[key] = (validator, time.monotonic() + self.ttl, payload)
+            self._bytes[dbname] = self._bytes.get(dbname, 0) + len(payload)
+            while len(entries) > self.max_entries or self._bytes[dbname] > self.max_bytes:
+                self._remove(dbname, next(iter(entries)))
+
+    def clear(self, dbname):
+        """Drop every entry of the database"""
+        with self._lock:
+            self._entries.pop(dbname, None)
+            self._bytes.pop(dbname, None)
+
+    def stats(self, dbname):
+        with self._lock:
+            return {
+                'entries': len(self._entries.get(dbname, ())),
+                'bytes': self._bytes.get(dbname, 0),
+                'hits': self._hits.get(dbname, 0),
+                'misses': self._misses.get(dbname, 0),
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+            }
+
+    def _remove(self, dbname, key):
+        entry = self._entries[dbname].pop(key)
+        self._bytes[dbname] -= len(entry[2])
+
+
+item_list_cache = ItemListCache()
@@ -0,0 +1,229 @@
+from odoo import api, fields, models
+from odoo.tools import SQL, split_every, str2bool
+from odoo.tools.sql import create_index
+from psycopg2.extras import execute_values
+import json
+import logging
+from .item import create_trigram_indexes, search_keyset
+
+_logger = logging.getLogger(__name__)
+
+# Language and batch size the read model rows are serialized with
+ITEM_LIST_ROW_LANG = 'en_US'
+ITEM_LIST_ROW_BATCH_SIZE = 1000
+
+# product.template fields copied as plain columns, so that item list
+# domains and sort keys apply to the read model unchanged
+ITEM_LIST_ROW_FIELDS = [
+    'active', 'name', 'default_code', 'barcode', 'list_price', 'item_status', 'on_hand', 'type',
+    'item_unit', 'tax_code', 'categ_id', 'feed_brand_id', 'vendor1_id', 'vendor2_id',
+    'create_uid', 'create_date', 'write_uid', 'write_date',
+]
+
+# precommit data key of the templates waiting for a refresh
+ITEM_LIST_ROW_PENDING = 'kiss_pos.item_list_row.pending'
+
+# Transactions touching more templates than this queue their refresh for
+# the cron instead of re-serializing the rows before committing
+ITEM_LIST_ROW_SYNC_LIMIT = 200
+
+# Table of the template ids waiting for the refresh cron
+ITEM_LIST_ROW_QUEUE = 'kiss_pos_item_list_row_queue'
+
+class ItemListRow(models.Model):
+    """
+    Flat copy of the item list grid, one row per product template with the
+    same id.
+
+    Each row holds the serialized item list entry (names of the category,
+    companies, suppliers, brand and users already resolved) next to the
+    template columns the list filters and sorts on, so a list page is one
+    indexed scan of this table. Rows are refreshed right before commit by the
+    ORM hooks of the templates, their variants and the renamed records;
+    transactions touching many templates queue them for a cron instead,
+    and the item list reads the templates until the queue is drained.
+    """
+    _name = 'kiss_pos.item_list_row'
+    _description = 'Item List Row'
+    _order = 'id desc'
+
+    active = fields.Boolean(default=True, index=True)
+    name = fields.Char()
+    default_code = fields.Char()
+    barcode = fields.Char()
+    list_price = fields.Float()
+    item_status = fields.Char()
+    on_hand = fields.Float()
+    type = fields.Char()
+    item_unit = fields.Char()
+    tax_code = fields.Char()
+    categ_id = fields.Integer(index=True)
+    feed_brand_id = fields.Integer(index=True)
+    vendor1_id = fields.Integer(index=True)
+    vendor2_id = fields.Integer(index=True)
+    payload = fields.Text(help="Item list entry serialized as JSON")
+
+    def init(self):
+        super().init()
+        cr = self.env.cr
+        create_trigram_indexes(cr, self._table, {
+            'kiss_pos_item_list_row_name_trgm_idx': ('name', "name"),
+            'kiss_pos_item_list_row_default_code_trgm_idx': ('default_code', "default_code"),
+            'kiss_pos_item_list_row_barcode_trgm_idx': ('barcode', "barcode"),
+        })
+        for index_name, expression in [
+            ('kiss_pos_item_list_row_name_id_idx', "(COALESCE(name, ''))"),
+            ('kiss_pos_item_list_row_list_price_id_idx', "(COALESCE(list_price, 0))"),
+            ('kiss_pos_item_list_row_item_status_id_idx', "(COALESCE(item_status, ''))"),
+            ('kiss_pos_item_list_row_on_hand_id_idx', "(COALESCE(on_hand, 0))"),
+            ('kiss_pos_item_list_row_write_date_id_idx', "write_date"),
+        ]:
+            create_index(cr, index_name, self._table, [expression, 'id'])
+
+        cr.execute(SQL("CREATE TABLE IF NOT EXISTS %s (id INTEGER PRIMARY KEY)", SQL.identifier(ITEM_LIST_ROW_QUEUE)))
+
+        cr.execute(SQL("SELECT 1 FROM %s LIMIT 1", SQL.identifier(self._table)))
+        if not cr.fetchone():
+            self._rebuild()
+
+    @api.model
+    def _get_source_model(self):
+        """product.template in the language and company the rows are serialized with"""
+        return self.env['product.template'].sudo().with_company(
+            self.env.ref('base.main_company')
+        ).with_context(lang=ITEM_LIST_ROW_LANG, active_test=False)
+
+    @api.model
+    def _is_usable(self, domain):
+        """Whether an item list query on domain can be answered from the read model"""
+        if not str2bool(self.env['ir.config_parameter'].sudo().get_param('kiss_pos.item_list_read_model', 'True')):
+            return False
+        if (self.env.lang or 'en_US') != ITEM_LIST_ROW_LANG or self.env.company != self.env.ref('base.main_company'):
+            return False
+        # Rows waiting for the refresh cron are stale
+        self.env.cr.execute(SQL("SELECT 1 FROM %s LIMIT 1", SQL.identifier(ITEM_LIST_ROW_QUEUE)))
+        if self.env.cr.fetchone():
+            return False
+        # Many2one filters are stored as plain ids, names are only resolved
+        # by the product.template search
+        for leaf in domain:
+            if not isinstance(leaf, (list, tuple)):
+                continue
+            fname, _operator, value = leaf
+            if fname not in self._fields:
+                return False
+            if self._fields[fname].type == 'integer':
+                values = value if isinstance(value, (list, tuple)) else [value]
+                if not all(isinstance(v, int) for v in values):
+                    return False
+        return True
+
+    @api.model
+    def _schedule_refresh(self, product_tmpl_ids):
+        """Refresh the rows of the given templates right before the transaction commits"""
+        if not product_tmpl_ids:
+            return
+        cr = self.env.cr
+        pending = cr.precommit.data.get(ITEM_LIST_ROW_PENDING)
+        if pending is None:
+            pending = cr.precommit.data[ITEM_LIST_ROW_PENDING] = set()
+
+            @cr.precommit.add
+            def refresh():
+                product_tmpl_ids = sorted(cr.precommit.data.pop(ITEM_LIST_ROW_PENDING, ()))
+                if len(product_tmpl_ids) > ITEM_LIST_ROW_SYNC_LIMIT:
+                    self._queue_refresh(product_tmpl_ids)
+                else:
+                    self._refresh(product_tmpl_ids)
+
+        pending.update(product_tmpl_ids)
+
+    @api.model
+    def _queue_refresh(self, product_tmpl_ids):
+        """Leave the refresh of the given templates to the cron, committed with the changes"""
+        execute_values(
+            self.env.cr._obj,
+            f'INSERT INTO "{ITEM_LIST_ROW_QUEUE}" (id) VALUES %s ON CONFLICT DO NOTHING',
+            [(product_tmpl_id,) for product_tmpl_id in product_tmpl_ids],
+        )
+        self.env.ref('kiss_pos.ir_cron_refresh_item_list_rows').sudo()._trigger()
+
+    @api.model
+    def _cron_refresh_item_list_rows(self):
+        """Refresh the queued rows, committing every batch"""
+        cr = self.env.cr
+        while True:
+            cr.execute(SQL(
+                "DELETE FROM %(queue)s WHERE id IN (SELECT id FROM %(queue)s ORDER BY id LIMIT %(limit)s "
+                "FOR UPDATE SKIP LOCKED) RETURNING id",
+                queue=SQL.identifier(ITEM_LIST_ROW_QUEUE), limit=ITEM_LIST_ROW_BATCH_SIZE,
+            ))
+            product_tmpl_ids = [row[0] for row in cr.fetchall()]
+            if not product_tmpl_ids:
+                break
+            self._refresh(product_tmpl_ids)
+            cr.commit()
+
+    @api.model
+    def _refresh(self, product_tmpl_ids):
+        """Rewrite the rows of the given templates, dropping those of removed templates"""
+        if not product_tmpl_ids:
+            return
+        Product = self._get_source_model()
+        templates = Product.browse(product_tmpl_ids).exists()
+        removed_ids = set(product_tmpl_ids) - set(templates.ids)
+        if removed_ids:
+            self.env.cr.execute(SQL(
+                "DELETE FROM %s WHERE id = ANY(%s)", SQL.identifier(self._table), list(removed_ids)
+            ))
+
+        fnames = [fname for fname in ITEM_LIST_ROW_FIELDS if fname in Product._fields]
+        columns = ['id', *fnames, 'payload']
+        query = 'INSERT INTO "{table}" ({columns}) VALUES %s ON CONFLICT (id) DO UPDATE SET {updates}'.format(
+            table=self._table,
+            columns=', '.join(f'"{column}"' for column in columns),
+            updates=', '.join(f'"{column}" = EXCLUDED."{column}"' for column in columns[1:]),
+        )
+        for batch_ids in split_every(ITEM_LIST_ROW_BATCH_SIZE, templates.ids):
+            batch = Product.browse(batch_ids)
+            rows = batch.read(fnames, load=None)
+            items = batch._get_item_list_data()
+            execute_values(self.env.cr._obj, query, [
+                (row['id'], *(row[fname] for fname in fnames), json.dumps(item_data))
+                for row, item_data in zip(rows, items)
+            ])
+            Product.env.invalidate_all()
+        self.invalidate_model()
+
+    @api.model
+    def _rebuild(self):
+        """Repopulate the whole read model from the product templates"""
+        self.env.cr.execute(SQL("DELETE FROM %s", SQL.identifier(self._table)))
+        product_tmpl_ids = self._get_source_model().search([]).ids
+        _logger.info(f"Rebuilding the item list read model for {len(product_tmpl_ids)} items")
+        self._refresh(product_tmpl_ids)
+
+    @api.model
+    def _search_keyset(self, domain, order='id', descending=True, after=None, limit=None):
+        """Return ``[(id, sort value)]`` of the rows matching domain, see search_keyset()"""
+        return search_keyset(self, domain, order, descending, after, limit)
+
+    def _get_item_list_data(self, columns=None, raw=False):
+        """Same output as product.template._get_item_list_data(), read from the stored payloads"""
+        columns = self.env['product.template']._get_item_list_columns(columns)
+        self.env.cr.execute(SQL(
+            "SELECT id, payload, list_price FROM %s WHERE id = ANY(%s)",
+            SQL.identifier(self._table), list(self.ids)
+        ))
+        rows = {row_id: (payload, list_price) for row_id, payload, list_price in self.env.cr.fetchall()}
+
+        result = []
+        for row_id in self.ids:
+            if row_id not in rows:
+                continue
+            payload, list_price = rows[row_id]
+            item_data = json.loads(payload)
+            if raw:
+                item_data['unit_price'] = list_price
+            result.append({column: item_data.get(column) for column in columns})
+        return result
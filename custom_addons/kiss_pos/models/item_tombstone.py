@@ -0,0 +1,29 @@
+from odoo import api, fields, models
+from datetime import timedelta
+
+# How long removals are kept for delta sync clients
+TOMBSTONE_RETENTION_DAYS = 30
+
+class ItemTombstone(models.Model):
+    _name = 'kiss_pos.item_tombstone'
+    _description = 'Archived or Deleted Item'
+    _order = 'id'
+
+    product_tmpl_id = fields.Integer('Product Template ID', required=True, index=True)
+    reason = fields.Selection([
+        ('archived', 'Archived'),
+        ('deleted', 'Deleted'),
+    ], string='Reason', required=True)
+    create_date = fields.Datetime(index=True)
+
+    @api.model
+    def _record(self, product_tmpl_ids, reason):
+        """Log the removal of the given templates"""
+        if product_tmpl_ids:
+            self.sudo().create([{'product_tmpl_id': tmpl_id, 'reason': reason} for tmpl_id in product_tmpl_ids])
+
+    @api.autovacuum
+    def _gc_tombstones(self):
+        """Drop tombstones older than the retention period"""
+        limit_date = fields.Datetime.now() - timedelta(days=TOMBSTONE_RETENTION_DAYS)
+        self.search([('create_date', '<', limit_date)]).unlink()
@@ -0,0 +1,45 @@
+from odoo import api, models
+
+# Models whose records can be referenced by name in bulk edits and
+# imports -> values of the records created for unknown names
+NAME_RESOLVER_MODELS = {
+    'product.category': {},
+    'res.partner': {'supplier_rank': 1},
+}
+
+class NameResolver(models.AbstractModel):
+    """
+    Batched get-or-create of records by name.
+
+    The distinct names are looked up with one ``name in`` query, the
+    missing ones created with one create() call, and the ids memoized on
+    the cursor so the same names are not resolved again within a request
+    (or an import job).
+    """
+    _name = 'kiss_pos.name_resolver'
+    _description = 'Name Resolver'
+
+    @api.model
+    def _resolve(self, model_name, names):
+        """Return ``{name: id}`` for the given names, creating the records of unknown names"""
+        if model_name not in NAME_RESOLVER_MODELS:
+            raise ValueError(f"Records of {model_name} cannot be resolved by name")
+        cr = self.env.cr
+        if not cr.postrollback.data.get('kiss_pos.name_resolver'):
+            # Records created by a rolled back transaction are gone
+            cr.postrollback.data['kiss_pos.name_resolver'] = True
+            cr.postrollback.add(lambda: cr.cache.pop('kiss_pos.name_resolver', None))
+        memo = cr.cache.setdefault('kiss_pos.name_resolver', {}).setdefault(model_name, {})
+
+        names = {name.strip() for name in names if isinstance(name, str) and name.strip()}
+        missing = names - set(memo)
+        if missing:
+            Model = self.env[model_name].sudo()
+            # The oldest record wins when several share a name
+            for record in Model.search_read([('name', 'in', list(missing))], ['name'], order='id desc'):
+                memo[record['name']] = record['id']
+            unknown = sorted(missing - set(memo))
+            if unknown:
+                records = Model.create([dict(NAME_RESOLVER_MODELS[model_name], name=name) for name in unknown])
+                memo.update(zip(unknown, records.ids))
+        return {name: memo[name] for name in names}
@@ -0,0 +1,18 @@
+from odoo import models
+from .item_list_cache import item_list_cache
+
+class ProductDataFeedBrand(models.Model):
+    _inherit = "product.data.feed.brand"
+
+    def write(self, vals):
+        # Brand names are part of the cached item list payloads
+        if 'name' in vals:
+            item_list_cache.clear(self.env.cr.dbname)
+        res = super().write(vals)
+        if 'name' in vals:
+            templates = self.env['product.template'].sudo().with_context(active_test=False).search([
+                ('feed_brand_id', 'in', self.ids),
+            ])
+            templates._update_search_vector()
+            self.env['kiss_pos.item_list_row']._schedule_refresh(templates.ids)
+        return res
@@ -0,0 +1,111 @@
+from odoo import api, models
+from odoo.tools import SQL
+from odoo.tools.sql import column_exists
+from .barcode_index import CATALOG_FIELDS, create_catalog_version_sequence, notify_catalog_change
+from .item import BARCODE_UNIQUE_CONSTRAINT, create_trigram_indexes
+from .item_list_cache import item_list_cache
+import logging
+import psycopg2
+
+_logger = logging.getLogger(__name__)
+
+class ProductProduct(models.Model):
+    _inherit = "product.product"
+
+    def init(self):
+        super().init()
+        # Barcode and SKU searches on templates resolve through the variants
+        create_trigram_indexes(self.env.cr, self._table, {
+            'product_product_barcode_trgm_idx': ('barcode', "barcode"),
+            'product_product_default_code_trgm_idx': ('default_code', "default_code"),
+        })
+
+        # Version of the catalog the barcode indexes of the workers follow
+        create_catalog_version_sequence(self.env.cr)
+
+        # One product per barcode and company, a product without company
+        # holding its barcode for every company as Odoo's barcode check
+        # does; the key of the barcode upserts
+        cr = self.env.cr
+        cr.execute("DROP INDEX IF EXISTS product_product_kiss_barcode_company_uniq")
+        cr.execute("SELECT 1 FROM pg_constraint WHERE conname = %s", (BARCODE_UNIQUE_CONSTRAINT,))
+        if not cr.fetchone() and column_exists(cr, self._table, 'company_id'):
+            try:
+                with cr.savepoint(flush=False):
+                    cr.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+                    cr.execute(f"""
+                        ALTER TABLE product_product ADD CONSTRAINT {BARCODE_UNIQUE_CONSTRAINT}
+                        EXCLUDE USING gist (barcode WITH =, int4range(company_id, company_id, '[]') WITH &&)
+                        WHERE (barcode IS NOT NULL AND barcode != '')
+                    """)
+            except psycopg2.IntegrityError:
+                _logger.warning("Some products share a barcode within a company, the unique barcode constraint "
+                                "is not created and barcode upserts are not protected against concurrent "
+                                "creations until the duplicates are fixed")
+            except psycopg2.Error:
+                _logger.warning("btree_gist is not available, barcode upserts are not protected against "
+                                "concurrent creations")
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        products = super().create(vals_list)
+        item_list_cache.clear(self.env.cr.dbname)
+        products.product_tmpl_id._update_search_vector()
+        self.env['kiss_pos.item_list_row']._schedule_refresh(products.product_tmpl_id.ids)
+        notify_catalog_change(self.env)
+        return products
+
+    def write(self, vals):
+        res = super().write(vals)
+        # Cost, barcode and code of the cached item lists come from the variants
+        item_list_cache.clear(self.env.cr.dbname)
+        # Variant codes are part of the template search document
+        if 'barcode' in vals or 'default_code' in vals:
+            self.product_tmpl_id._update_search_vector()
+        # Cost, weight and volume of the item list come from the variants too
+        self.env['kiss_pos.item_list_row']._schedule_refresh(self.product_tmpl_id.ids)
+        # Barcodes, prices and availability of the store scans
+        if CATALOG_FIELDS.intersection(vals):
+            notify_catalog_change(self.env)
+        return res
+
+    @api.model
+    def _search_ranked(self, query, domain=None, limit=None, offset=0):
+        """
+        Return the ids of the variants matching the words of query within
+        domain, by relevance of their template as in the ranked item search
+        """
+        ranked = self._get_ranked_query(query, domain)
+        if not ranked:
+            return []
+        search_query, rank = ranked
+        search_query.order = SQL("%s DESC, %s DESC", rank, SQL.identifier(self._table, 'id'))
+        search_query.limit = limit
+        search_query.offset = offset
+        self.env.cr.execute(search_query.select(SQL.identifier(self._table, 'id')))
+        return [row[0] for row in self.env.cr.fetchall()]
+
+    @api.model
+    def _search_ranked_count(self, query, domain=None):
+        """Number of variants _search_ranked() returns without limit"""
+        ranked = self._get_ranked_query(query, domain)
+        if not ranked:
+            return 0
+        self.env.cr.execute(ranked[0].select(SQL("COUNT(*)")))
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _get_ranked_query(self, query, domain=None):
+        """Unordered query of the variants matching query and the rank of their template, None without words"""
+        tsquery = self.env['product.template']._get_search_tsquery(query)
+        if not tsquery:
+            return None
+        self.env.flush_all()
+        search_query = self._search(domain or [])
+        alias = search_query.make_alias(self._table, 'product_tmpl_id')
+        search_query.add_join('JOIN', alias, 'product_template', SQL(
+            "%s = %s", SQL.identifier(self._table, 'product_tmpl_id'), SQL.identifier(alias, 'id'),
+        ))
+        vector = SQL.identifier(alias, 'kiss_search_vector')
+        search_query.add_where(SQL("%s @@ to_tsquery('simple', %s)", vector, tsquery))
+        return search_query, SQL("ts_rank_cd(%s, to_tsquery('simple', %s))", vector, tsquery)
@@ -0,0 +1,29 @@
+from odoo import models
+from .item_list_cache import item_list_cache
+
+class ResPartner(models.Model):
+    _inherit = "res.partner"
+
+    def write(self, vals):
+        # Supplier and user names are part of the cached item list payloads
+        if 'name' in vals:
+            item_list_cache.clear(self.env.cr.dbname)
+        res = super().write(vals)
+        if 'name' in vals:
+            self._refresh_item_list_rows()
+        return res
+
+    def _refresh_item_list_rows(self):
+        """Schedule the refresh of the item list rows showing the name of these partners"""
+        companies = self.env['res.company'].sudo().search([('partner_id', 'in', self.ids)])
+        users = self.env['res.users'].sudo().with_context(active_test=False).search([('partner_id', 'in', self.ids)])
+        templates = self.env['product.template'].sudo().with_context(active_test=False).search([
+            '|', '|', '|', '|', '|',
+            ('vendor1_id', 'in', self.ids),
+            ('vendor2_id', 'in', self.ids),
+            ('company_id', 'in', companies.ids),
+            ('parent_company_id', 'in', companies.ids),
+            ('create_uid', 'in', users.ids),
+            ('write_uid', 'in', users.ids),
+        ])
+        self.env['kiss_pos.item_list_row']._schedule_refresh(templates.ids)
@@ -1,6 +1,5 @@
 /** @odoo-module **/
 import { Component, useState, xml } from "@odoo/owl";
-import { rpc } from "@web/core/network/rpc";
 import { Toast } from "../Common/toast";
 
 
@@ -38,168 +37,28 @@ export class BulkEdit extends Component {
 
         const selectedField = this.selectedField.value;
         const isPriceUpdate = selectedField === 'price';
-        const isItemNameUpdate = selectedField === 'item';
-
-        const numericFields = ['price', 'cost', 'msrp', 'on_hand', 'in_transit', 'reorder_point', 'restock_level', 'min_order_qty'];
-        const many2oneFields = ['vendor1_id', 'vendor2_id', 'categ_id'];
-
-        for (const item of this.props.items) {
-            let productId = item.id;
-            let product = null;
-            const fieldsToRead = ['id'];
-
-            if (isPriceUpdate) fieldsToRead.push('list_price');
-
-            if (!productId) {
-                const products = await rpc('/web/dataset/call_kw', {
-                    model: 'product.template',
-                    method: 'search_read',
-                    args: [[['name', '=', item.name]]],
-                    kwargs: { fields: fieldsToRead },
-                });
-                if (products.length > 0) {
-                    product = products[0];
-                    productId = product.id;
-                } else {
-                    console.warn(`Product not found for name: ${item.name}`);
-                    continue;
-                }
-            } else {
-                const products = await rpc('/web/dataset/call_kw', {
-                    model: 'product.template',
-                    method: 'read',
-                    args: [[productId]],
-                    kwargs: { fields: fieldsToRead },
-                });
-                product = products[0];
-            }
-
-            const fieldMap = {
-                item: 'name',
-                status: 'item_status',
-                cost: 'standard_price',
-                msrp: 'msrp',
-                brand: 'brand',
-                size: 'size',
-                dimension: 'dimension',
-                item_unit: 'item_unit',
-                packaging_type: 'packaging_type',
-                srs_category: 'srs_category',
-                color_name: 'color_name',
-                on_hand: 'on_hand',
-                inventory_tracking: 'inventory_tracking',
-                in_transit: 'in_transit',
-                reorder_point: 'reorder_point',
-                restock_level: 'restock_level',
-                min_order_qty: 'min_order_qty',
-                age_restriction: 'age_restriction',
-                use_ebt: 'use_ebt',
-                vendor1_id: 'vendor1_id',
-                vendor2_id: 'vendor2_id',
-                categ_id: 'categ_id',
-                item_type: 'item_type',
-                weight: 'weight',
-                volume: 'volume',
-                sku: 'default_code',
-                tax_code: 'tax_code',
-            };
-
-            const fieldToUpdate = {};
-
-            if (isPriceUpdate) {
-                const inputValue = parseFloat(this.newValue.value);
-                const currentPrice = parseFloat(product.list_price || 0);
-                if (this.priceMethod.value === 'set') {
-                    fieldToUpdate['list_price'] = inputValue;
-                } else if (this.priceMethod.value === 'increase') {
-                    fieldToUpdate['list_price'] =
-                        this.unitType.value === '%' ?
-                            currentPrice + (currentPrice * inputValue / 100) :
-                            currentPrice + inputValue;
-                } else if (this.priceMethod.value === 'decrease') {
-                    fieldToUpdate['list_price'] =
-                        this.unitType.value === '%' ?
-                            currentPrice - (currentPrice * inputValue / 100) :
-                            currentPrice - inputValue;
-                }
-            } else if (isItemNameUpdate) {
-                fieldToUpdate['name'] = this.newValue.value;
-            } else {
-                const fieldName = fieldMap[selectedField];
-                if (fieldName) {
-                    let value;
-                    if (numericFields.includes(selectedField)) {
-                        value = parseFloat(this.newValue.value);
-                    } else if (many2oneFields.includes(selectedField)) {
-                        const inputName = this.newValue.value.trim();
-
-                        if (selectedField === 'categ_id') {
-                            const existingCategory = await rpc('/web/dataset/call_kw', {
-                                model: 'product.category',
-                                method: 'search_read',
-                                args: [[['name', '=', inputName]]],
-                                kwargs: { fields: ['id'], limit: 1 },
-                            });
-
-                            let categoryId;
-                            if (existingCategory.length > 0) {
-                                categoryId = existingCategory[0].id;
-                            } else {
-                                categoryId = await rpc('/web/dataset/call_kw', {
-                                    model: 'product.category',
-                                    method: 'create',
-                                    args: [{ name: inputName }],
-                                    kwargs: {},
-                                });
-                                console.log(`Created new category "${inputName}" with ID ${categoryId}`);
-                            }
-
-                            value = categoryId;
-                        } else {
-                            const existingVendor = await rpc('/web/dataset/call_kw', {
-                                model: 'res.partner',
-                                method: 'search_read',
-                                args: [[['name', '=', inputName]]],
-                                kwargs: { fields: ['id'], limit: 1 },
-                            });
-
-                            let vendorId;
-                            if (existingVendor.length > 0) {
-                                vendorId = existingVendor[0].id;
-                            } else {
-                                vendorId = await rpc('/web/dataset/call_kw', {
-                                    model: 'res.partner',
-                                    method: 'create',
-                                    args: [{
-                                        name: inputName,
-                                        supplier_rank: 1,
-                                    }],
-                                    kwargs: {},
-                                });
-                                console.log(` Created new vendor "${inputName}" with ID ${vendorId}`);
-                            }
-
-                            value = vendorId;
-                        }
-                    } else {
-                        value = this.newValue.value;
-                    }
-                    fieldToUpdate[fieldName] = value;
-                } else {
-                    console.warn(` No field mapping found for "${selectedField}"`);
-                }
-            }
-
-            if (Object.keys(fieldToUpdate).length > 0) {
-                console.log(` Updating product ${productId} with:`, fieldToUpdate);
-                await rpc('/web/dataset/call_kw', {
-                    model: 'product.template',
-                    method: 'write',
-                    args: [[productId], fieldToUpdate],
-                    kwargs: {},
-                });
-            }
+        // Category and vendor names are resolved (or created) on the server
+        const value = this.newValue.value;
+
+        const payload = {
+            ids: this.props.items.map((item) => item.id).filter((id) => id),
+            field: selectedField,
+            operation: isPriceUpdate ? (this.priceMethod.value || 'set') : 'set',
+            unit: this.unitType.value === '%' ? '%' : 'absolute',
+            value: value,
+        };
+
+        const res = await fetch("/api/bulk_edit", {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify(payload),
+        });
+        const result = await res.json();
+        if (!result.success) {
+            Toast.error(result.error || "Item Edit failed!");
+            return;
         }
+        console.log(` Updated ${result.affected} items with:`, payload);
         Toast.success("Item Edit successfully!");
         this.closeModal()
 }
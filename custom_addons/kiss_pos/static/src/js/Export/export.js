@@ -2,6 +2,16 @@
 import { Component, useState, xml } from "@odoo/owl";
 import { Toast } from "../Common/toast";
 
+// Export field labels -> item list keys of /api/export_items
+const EXPORT_COLUMNS = {
+    "Barcode": "barcode",
+    "SKU": "sku",
+    "Description": "name",
+    "Selling Price": "unit_price",
+    "Category": "category",
+    "Company Code": "company",
+};
+
 export class Export extends Component {
     setup() {
         this.state = useState({
@@ -24,100 +34,50 @@ export class Export extends Component {
 
     static props = {
         onClose: Function,
-        items: { type: Array, optional: true }
+        items: { type: Array, optional: true },
+        filters: { type: Object, optional: true },
+        search: { type: String, optional: true }
     };
 
     closeModal() {
         this.props.onClose();
     }
 
-    exportItem() {
+    async exportItem() {
         const selectedFields = this.state.selectedFields
-            .filter(field => field.selected)
+            .filter(field => field.selected && EXPORT_COLUMNS[field.name])
             .sort((a, b) => a.order - b.order);
-        
+
+        const format = this.state.exportFormat === 'Excel' ? 'xlsx' : 'csv';
+        const body = {
+            columns: selectedFields.map(field => EXPORT_COLUMNS[field.name]),
+            headers: selectedFields.map(field => field.name),
+            format: format,
+        };
         if (this.props.items && this.props.items.length > 0) {
-            if (this.state.exportFormat === 'CSV') {
-                this.exportToCSV(selectedFields, this.props.items);
-            } else if (this.state.exportFormat === 'Excel') {
-                this.exportToExcel(selectedFields, this.props.items);
-            }
+            body.ids = this.props.items.map(item => item.id);
+        } else {
+            // The items matching the list filters are selected by the server
+            body.filters = this.props.filters || {};
+            body.search = this.props.search || "";
         }
-    }
 
-    exportToCSV(fields, items) {
-        const headers = fields.map(field => field.name);
-        const csvContent = [headers];
-        
-        items.forEach(item => {
-            const row = fields.map(field => {
-                // Get value based on field name (case-insensitive match)
-                const fieldKey = Object.keys(item).find(
-                    key => key.toLowerCase() === field.name.toLowerCase()
-                );
-                let value = fieldKey ? item[fieldKey] : '';
-                
-                // Escape values with quotes if they contain commas or quotes
-                if (typeof value === 'string' && (value.includes(',') || value.includes('"'))) {
-                    value = `"${value.replace(/"/g, '""')}"`;
-                }
-                return value ?? '';
-            });
-            csvContent.push(row);
+        // The file is generated and streamed by the server
+        const res = await fetch("/api/export_items", {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify(body),
         });
-        
-        // Convert to CSV string
-        const csvString = csvContent.map(row => row.join(',')).join('\n');
-        
-        // Create blob and download
-        const blob = new Blob([csvString], { type: 'text/csv;charset=utf-8;' });
-        this.downloadFile(blob, 'export.csv');
+        if (!res.ok) {
+            Toast.error("Export failed.");
+            return;
+        }
+        this.downloadFile(await res.blob(), `export.${format}`);
 
         this.closeModal()
-        Toast.info(`Print job sent successfully. Exported ${this.props.items.length} items as CSV.`)
+        Toast.info(`Print job sent successfully. Exported ${body.ids ? body.ids.length : 'all matching'} items as ${format === 'xlsx' ? 'EXCEL' : 'CSV'}.`)
     }
 
-    exportToExcel(fields, items) {
-        
-        // Create a workbook with a worksheet
-        const worksheet = this.createWorksheet(fields, items);
-        
-        // Convert worksheet to Excel-like format
-        // Note: This is a simple CSV with Excel MIME type - for a full Excel file
-        // we typically need to use a library like SheetJS or server-side processing
-        const blob = new Blob([worksheet], { 
-            type: 'application/vnd.ms-excel;charset=utf-8;' 
-        });
-        this.downloadFile(blob, 'export.xlsx');
-
-        this.closeModal()
-        Toast.info(`Print job sent successfully. Exported ${this.props.items.length} items as EXCEL.`)
-    }
-    
-    createWorksheet(fields, items) {
-        const headers = fields.map(field => field.name);
-        const rows = [headers];
-        
-        items.forEach(item => {
-            const row = fields.map(field => {
-                // Get value based on field name (case-insensitive match)
-                const fieldKey = Object.keys(item).find(
-                    key => key.toLowerCase() === field.name.toLowerCase()
-                );
-                let value = fieldKey ? item[fieldKey] : '';
-                
-                if (typeof value === 'string' && (value.includes(',') || value.includes('"') || value.includes('\n'))) {
-                    value = `"${value.replace(/"/g, '""')}"`;
-                }
-                return value ?? '';
-            });
-            rows.push(row);
-        });
-        
-        // Join rows with newlines and columns with tabs (Excel-friendly)
-        return rows.map(row => row.join('\t')).join('\n');
-    }
-    
     downloadFile(blob, filename) {
         const link = document.createElement('a');
         link.href = URL.createObjectURL(blob);
@@ -1,6 +1,5 @@
 /** @odoo-module **/
 import { Component, xml, useRef, useState, App } from "@odoo/owl";
-import { rpc } from "@web/core/network/rpc";
 
 export class ImportItem extends Component {
     setup() {
@@ -60,150 +59,66 @@ setProgress(value, colorClass = "progress-bar bg-blue-500", statusText = "") {
 }
     handleFile(file) {
         if (file && (file.name.endsWith(".csv") || file.name.endsWith(".xlsx")))  {
-            const reader = new FileReader();
-            reader.onload = (e) => {
-                const text = e.target.result;
-                const rows = text.trim().split("\n");
-                const headers = rows[0].split(",").map(h => h.trim());
-
-                const requiredFields = ['item_name', 'sku', 'description', 'barcode', 'selling_price'];
-                const missingFields = requiredFields.filter(field => !headers.includes(field));
-                if (missingFields.length > 0) {
-                    this.setProgress(30, "progress-bar bg-red-500", `Upload Failed (Missing columns: ${missingFields.join(", ")})`);
-                    return;
-                }
-
-                const data = rows.slice(1).map((row) => {
-                    const values = row.split(",").map(v => v.trim());
-                    const entry = {};
-                    headers.forEach((header, i) => {
-                        entry[header] = values[i];
-                    });
-                    return entry;
-                });
-
-                const invalidRows = data.filter(item =>
-                    requiredFields.some(field => !item[field])
-                );
-
-                if (invalidRows.length > 0) {
-                    this.setProgress(30, "progress-bar bg-red-500", "Upload Failed (Missing required data in rows)");
-                    return;
-                }
-
-                this.uploadedData.data = data;
-                this.uploadDataWithProgress(data);
-            };
-            reader.readAsText(file);
+            this.uploadFile(file);
         } else {
             this.setProgress(30, "progress-bar bg-red-500", "Upload Failed (File Format Incorrect)");
         }
     }
 
-async uploadDataWithProgress(data) {
-    const totalItems = data.length;
-    let uploadedItems = 0;
-    let skippedItems = 0;
+// The file is imported by a background job on the server, whose progress is polled
+async uploadFile(file) {
+    this.setProgress(1, "progress-bar bg-blue-500", `Uploading ${file.name}`);
 
-    this.setProgress(0, "progress-bar bg-blue-500", `Uploading item 0 of ${totalItems}`);
+    const formData = new FormData();
+    formData.append("file", file);
 
-    const stripHtml = (html) => (html || '').replace(/<[^>]+>/g, '').trim();
-
-    for (let i = 0; i < totalItems; i++) {
-        const item = data[i];
-        let shouldUpload = true;
-
-        const existingProduct = await rpc('/web/dataset/call_kw', {
-            model: 'product.template',
-            method: 'search_read',
-            args: [[['barcode', '=', item.barcode]], ['name', 'default_code', 'description', 'list_price']],
-            kwargs: {},
-        });
-
-        if (existingProduct.length > 0) {
-            const ep = existingProduct[0];
-            const nameMatch = (ep.name || '').trim() === (item.item_name || '').trim();
-            const codeMatch = (ep.default_code || '').trim() === (item.sku || '').trim();
-            const descMatch = stripHtml(ep.description) === (item.description || '').trim();
-            const priceMatch = parseFloat(ep.list_price).toFixed(2) === parseFloat(item.selling_price).toFixed(2);
-
-            if (nameMatch && codeMatch && descMatch && priceMatch) {
-                shouldUpload = false;
-                skippedItems++;
-            }
-        }
-
-        if (shouldUpload) {
-            await this.sendToAPI(item);
-            uploadedItems++;
+    try {
+        const res = await fetch("/api/import_jobs", { method: "POST", body: formData });
+        const result = await res.json();
+        if (!result.success) {
+            this.setProgress(30, "progress-bar bg-red-500", `Upload Failed (${result.error})`);
+            return;
         }
+        this.pollImportJob(result.job_id);
+    } catch (error) {
+        console.error("Error sending data to API:", error);
+        this.setProgress(30, "progress-bar bg-red-500", "Upload Failed");
+    }
+}
 
-        const processedItems = uploadedItems + skippedItems;
-        const progress = Math.floor((processedItems / totalItems) * 100);
-        const isComplete = processedItems === totalItems;
+async pollImportJob(jobId) {
+    try {
+        const res = await fetch(`/api/import_jobs/${jobId}`);
+        const job = await res.json();
 
-        let message = '';
-        if (shouldUpload) {
-            message = `Uploading item ${processedItems} of ${totalItems}`;
-        } else {
-            message = `All data is already up to date`;
+        if (job.state === "failed") {
+            this.setProgress(30, "progress-bar bg-red-500", `Upload Failed (${job.error})`);
+            return;
         }
 
-        if (isComplete) {
-            if (uploadedItems > 0) {
-                message = `${progress}% Complete`;
-            } else {
-                message = `All data is already up to date`;
+        if (job.state === "done") {
+            this.uploadedData.data = job.errors;
+            let message = job.created + job.updated > 0 ? "100% Complete" : "All data is already up to date";
+            if (job.failed > 0) {
+                message += ` (${job.failed} of ${job.row_count} rows failed)`;
             }
+            this.setProgress(100, "progress-bar bg-blue-500", message);
+            return;
         }
 
-        this.setProgress(progress, "progress-bar bg-blue-500", message);
+        // Stay between the error (30) and done (100) states of the template
+        const progress = Math.min(Math.max(Math.floor(job.progress), 1), 99);
+        const message = job.state === "queued"
+            ? "Waiting for the import to start"
+            : `Importing item ${job.processed} of ${job.row_count} (${job.throughput} items/s)`;
+        this.setProgress(progress === 30 ? 31 : progress, "progress-bar bg-blue-500", message);
+        setTimeout(() => this.pollImportJob(jobId), 1000);
+    } catch (error) {
+        console.error("Error fetching import progress:", error);
+        this.setProgress(30, "progress-bar bg-red-500", "Upload Failed");
     }
 }
 
-
-    async sendToAPI(data) {
-        try {
-            const existingProduct = await rpc('/web/dataset/call_kw', {
-                model: 'product.template',
-                method: 'search_read',
-                args: [[['barcode', '=', data.barcode]], ['id']],
-                kwargs: {},
-            });
-
-            if (existingProduct.length > 0) {
-                const productId = existingProduct[0].id;
-                await rpc('/web/dataset/call_kw', {
-                    model: 'product.template',
-                    method: 'write',
-                    args: [[productId], {
-                        name: data.item_name,
-                        default_code: data.sku,
-                        barcode: data.barcode,
-                        description: data.description,
-                        list_price: parseFloat(data["selling_price"]),
-                    }],
-                    kwargs: {},
-                });
-            } else {
-                await rpc('/web/dataset/call_kw', {
-                    model: 'product.template',
-                    method: 'create',
-                    args: [{
-                        name: data.item_name,
-                        default_code: data.sku,
-                        barcode: data.barcode,
-                        description: data.description,
-                        list_price: parseFloat(data["selling_price"]),
-                    }],
-                    kwargs: {},
-                });
-            }
-        } catch (error) {
-            console.error("Error sending data to API:", error);
-        }
-    }
-
     onDrop(ev) {
         ev.preventDefault();
         this.dropZone.el.classList.remove("border-gray-500", "bg-gray-100");
@@ -189,12 +189,19 @@ closeBulkEditModal() {
 }
 
   openExportModal() {
-    if (this.state.selectedItems.length === 0) {
-      Toast.error("Please select at least one item to export.");
-      return
-    }
     this.state.showExportModal = true;
   }
+
+  // Items picked by hand, exported by id. Without a selection (or with all
+  // loaded items selected) the export covers every item matching the
+  // current filters and search, resolved by the server.
+  get exportItems() {
+    const selected = this.state.selectedItems;
+    if (selected.length === 0 || selected.length === this.state.items.length) {
+      return undefined;
+    }
+    return selected;
+  }
   closeExportModal() {
     this.state.showExportModal = false;
   }
@@ -1304,7 +1311,7 @@ handleAddInputChange(event) {
     </table>
 </div>
     <t t-if="state.showExportModal">
-        <Export onClose="closeExportModal" items="state.selectedItems"/>
+        <Export onClose="closeExportModal" items="exportItems" filters="formatFiltersForPayload()" search="state.searchQuery"/>
     </t>
 
   <!-- Add Filter Modal -->
@@ -3,7 +3,7 @@
     'version': '1.0',
     'category': 'Point of Sale',
     'summary': 'Store Management Module',
-    'depends': ['point_of_sale', 'web', 'sale'],
+    'depends': ['point_of_sale', 'web', 'sale', 'kiss_pos'],
     'license': 'LGPL-3',
     'data': [
         'views/store_page_template.xml',
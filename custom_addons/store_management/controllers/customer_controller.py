@@ -1,11 +1,23 @@
 from odoo import http
 from odoo.http import request
+from odoo.addons.kiss_pos.controllers.utils import parse_list_format, to_columnar, encode_payload
 import json
 
+# Keys of the /api/customer/list rows, in columnar order
+CUSTOMER_COLUMNS = ['id', 'name', 'email', 'phone', 'mobile', 'street', 'city', 'country', 'vat', 'company']
+
+# Customer keys whose repeating values are dictionary encoded in the columnar formats
+CUSTOMER_DICTIONARY_COLUMNS = {'city', 'country', 'company'}
+
 class CustomerController(http.Controller):
     
     @http.route('/api/customer/list', type='http', auth='public', methods=['GET'])
     def get_customers(self, **kwargs):
+        try:
+            fmt = parse_list_format(kwargs.get('format'))
+        except ValueError as e:
+            return json.dumps({'status': 'error', 'message': str(e)})
+
         customers = request.env['res.partner'].sudo().search([('customer_rank', '>', 0)], order='create_date desc')
 
         customer_data = []
@@ -23,10 +35,14 @@ class CustomerController(http.Controller):
                 'company': customer.parent_id.name if customer.parent_id else None
             })
         
-        return json.dumps({
+        if fmt != 'json':
+            customer_data = to_columnar(customer_data, CUSTOMER_COLUMNS, CUSTOMER_DICTIONARY_COLUMNS)
+
+        payload, content_type = encode_payload({
             'status': 'success',
             'customers': customer_data
-        })
+        }, fmt)
+        return request.make_response(payload, headers=[('Content-Type', content_type)])
     
     @http.route('/api/customer/add', type='http', auth='public', methods=['POST'], csrf=False)
     def add_customer(self, **kwargs):
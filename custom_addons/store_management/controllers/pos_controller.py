@@ -1,7 +1,23 @@
 from odoo import http
+from odoo.exceptions import ConcurrencyError
 from odoo.http import request
+from odoo.addons.kiss_pos.controllers.utils import (
+    compute_etag, etag_matches, etag_headers, not_modified_response, parse_list_format, to_columnar, encode_payload,
+)
+from odoo.addons.kiss_pos.models.barcode_index import barcode_index
+import base64
+import gzip
 import json
 
+# Keys of the /api/store/products rows, in columnar order
+PRODUCT_COLUMNS = ['barcode', 'name', 'unit_price', 'quantity', 'price']
+
+# Upper bound for a single page of /api/store/products
+PRODUCT_MAX_LIMIT = 1000
+
+# Seconds terminals wait before asking again for a catalog being generated
+CATALOG_RETRY_AFTER = 30
+
 class StoreManagementController(http.Controller):
     
     @http.route('/store', type='http', auth='public', website=True)
@@ -10,23 +26,211 @@ class StoreManagementController(http.Controller):
     
     @http.route('/api/store/products', type='http', auth='public', methods=['GET'])
     def get_products(self, **kwargs):
-        products = request.env['product.product'].sudo().search([('available_in_pos', '=', True)], order='create_date desc')
+        """
+        POS products, best matches first with ``search`` and newest first
+        otherwise. ``limit`` and ``offset`` page the results (``total``
+        counting them all), ``fields`` restricts the keys returned, and
+        ``warehouse_id`` or ``config_id`` (the warehouse of a POS) scopes
+        the quantities to one warehouse instead of every internal location.
+        """
+        Product = request.env['product.product'].sudo()
+        domain = [('available_in_pos', '=', True)]
+        search = kwargs.get('search', '').strip()
+        try:
+            fmt = parse_list_format(kwargs.get('format'))
+            limit = min(int(kwargs['limit']), PRODUCT_MAX_LIMIT) if kwargs.get('limit') else None
+            offset = int(kwargs.get('offset') or 0)
+            if (limit is not None and limit <= 0) or offset < 0:
+                raise ValueError("Invalid limit or offset")
+            columns = [c.strip() for c in kwargs['fields'].split(',') if c.strip()] if kwargs.get('fields') else PRODUCT_COLUMNS
+            unknown = [column for column in columns if column not in PRODUCT_COLUMNS]
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+            warehouse = self._get_warehouse(kwargs.get('warehouse_id'), kwargs.get('config_id'))
+        except ValueError as e:
+            return json.dumps({'status': 'error', 'message': str(e)})
+
+        # Prices live on the templates and quantities on the quants, so their
+        # last writes are part of the validator as well
+        etag = compute_etag(
+            Product, domain, ['product.template', 'stock.quant'], search, fmt, limit, offset, columns, warehouse.id
+        )
+        if etag_matches(etag):
+            return not_modified_response(etag)
+
+        if search:
+            # Best matches first, using the ranked item search of kiss_pos,
+            # paged in SQL
+            total = Product._search_ranked_count(search, domain)
+            products = Product.browse(Product._search_ranked(search, domain, limit, offset))
+        else:
+            total = Product.search_count(domain)
+            products = Product.search(domain, order='create_date desc', offset=offset, limit=limit)
+
+        # One grouped query for the quantities of the whole page
+        quantities = {}
+        if 'quantity' in columns or 'price' in columns:
+            quantities = self._get_quantities(products, warehouse)
 
         product_data = []
         for product in products:
-            product_data.append({
+            quantity = quantities.get(product.id, 0.0)
+            row = {
                 'barcode': product.barcode,
                 'name': product.name,
                 'unit_price': product.list_price,
-                'quantity': product.qty_available,
-                'price': product.list_price * product.qty_available
-            })
+                'quantity': quantity,
+                'price': product.list_price * quantity
+            }
+            product_data.append({column: row[column] for column in columns})
         
-        return json.dumps({
+        if fmt != 'json':
+            product_data = to_columnar(product_data, columns)
+
+        payload, content_type = encode_payload({
             'status': 'success',
-            'products': product_data
-        })
-    
+            'products': product_data,
+            'total': total,
+            'limit': limit,
+            'offset': offset,
+        }, fmt)
+        return request.make_response(
+            payload,
+            headers=[('Content-Type', content_type)] + etag_headers(etag)
+        )
+
+    def _get_warehouse(self, warehouse_id=None, config_id=None):
+        """Warehouse the quantities are scoped to, empty for all of them"""
+        if warehouse_id:
+            warehouse = request.env['stock.warehouse'].sudo().browse(int(warehouse_id)).exists()
+            if not warehouse:
+                raise ValueError("Warehouse not found")
+            return warehouse
+        if config_id:
+            config = request.env['pos.config'].sudo().browse(int(config_id)).exists()
+            if not config:
+                raise ValueError("POS not found")
+            return config.picking_type_id.warehouse_id
+        return request.env['stock.warehouse']
+
+    def _get_quantities(self, products, warehouse):
+        """
+        On hand quantities of products, ``{product id: quantity}``, summed
+        from the quants of the internal locations (of warehouse if given,
+        of the current companies otherwise)
+        with one grouped query instead of one qty_available compute per
+        product.
+        """
+        if not products:
+            return {}
+        domain = [('product_id', 'in', products.ids), ('location_id.usage', '=', 'internal')]
+        if warehouse:
+            domain.append(('location_id', 'child_of', warehouse.view_location_id.id))
+        else:
+            # As qty_available, only the stock of the current companies
+            domain.append(('company_id', 'in', request.env.companies.ids))
+        groups = request.env['stock.quant'].sudo()._read_group(domain, ['product_id'], ['quantity:sum'])
+        return {product.id: quantity for product, quantity in groups}
+
+    @http.route('/api/store/scan/<string:barcode>', type='http', auth='public', methods=['GET'])
+    def scan_barcode(self, barcode, **kwargs):
+        """
+        Sellable product of a scanned barcode, with its price, taxes and
+        age restriction and EBT flags. Answered from the in-memory barcode
+        index of the worker, which follows catalog changes within about a
+        second.
+        """
+        product = barcode_index.lookup(request.env, barcode.strip())
+        if not product:
+            return request.make_response(
+                json.dumps({'status': 'error', 'message': 'Product not found'}),
+                headers=[('Content-Type', 'application/json')],
+                status=404
+            )
+        return request.make_response(
+            json.dumps({'status': 'success', 'product': product}),
+            headers=[('Content-Type', 'application/json')]
+        )
+
+    @http.route('/api/store/catalog/<int:config_id>', type='http', auth='public', methods=['GET'])
+    def get_catalog(self, config_id, **kwargs):
+        """
+        Current catalog snapshot of a POS: its version and the URL of the
+        compressed catalog, which never changes once published. Terminals
+        poll this and only download a catalog when its version changed.
+        """
+        config = request.env['pos.config'].sudo().browse(config_id).exists()
+        if not config:
+            return request.make_response(
+                json.dumps({'status': 'error', 'message': 'POS not found'}),
+                headers=[('Content-Type', 'application/json')],
+                status=404
+            )
+        snapshot = request.env['kiss_pos.catalog_snapshot'].sudo()._get_snapshot(config)
+        if not snapshot:
+            # Generated once by the cron rather than by every terminal asking
+            return request.make_response(
+                json.dumps({'status': 'pending', 'message': 'Catalog is being generated'}),
+                headers=[('Content-Type', 'application/json'), ('Retry-After', str(CATALOG_RETRY_AFTER))],
+                status=503
+            )
+
+        etag = f'{snapshot.checksum}-{snapshot.version}'
+        if etag_matches(etag):
+            return not_modified_response(etag)
+        return request.make_response(
+            json.dumps({
+                'status': 'success',
+                'config_id': config.id,
+                'version': snapshot.version,
+                'checksum': snapshot.checksum,
+                'product_count': snapshot.product_count,
+                'size': snapshot.size,
+                'synced_at': snapshot.synced_at.isoformat() if snapshot.synced_at else None,
+                'url': f'/api/store/catalog/{config.id}/{snapshot.version}',
+            }),
+            headers=[('Content-Type', 'application/json')] + etag_headers(etag)
+        )
+
+    @http.route('/api/store/catalog/<int:config_id>/<int:version>', type='http', auth='public', methods=['GET'])
+    def get_catalog_version(self, config_id, version, **kwargs):
+        """
+        Compressed catalog of a POS at a given version. A version never
+        changes, so it is cached for good by the terminals and any proxy in
+        between; only the current version is kept.
+        """
+        # Snapshots created by the cron have no file until first generated
+        snapshot = request.env['kiss_pos.catalog_snapshot'].sudo().search([
+            ('config_id', '=', config_id), ('checksum', '!=', False),
+        ])
+        if not snapshot or snapshot.version != version:
+            return request.make_response(
+                json.dumps({
+                    'status': 'error',
+                    'message': 'Catalog version not available',
+                    'version': snapshot.version or None,
+                }),
+                headers=[('Content-Type', 'application/json')],
+                status=404
+            )
+
+        headers = [
+            ('ETag', f'"{snapshot.checksum}"'),
+            ('Cache-Control', 'public, max-age=31536000, immutable'),
+        ]
+        if etag_matches(snapshot.checksum):
+            return request.make_response('', headers=headers, status=304)
+
+        data = base64.b64decode(snapshot.file)
+        if 'gzip' in request.httprequest.accept_encodings:
+            headers.append(('Content-Encoding', 'gzip'))
+        else:
+            data = gzip.decompress(data)
+        return request.make_response(
+            data,
+            headers=[('Content-Type', 'application/json'), ('Vary', 'Accept-Encoding')] + headers
+        )
+
     @http.route('/api/store/add_item', type='http', auth='public', methods=['POST'], csrf=False)
     def add_item(self, **kwargs):
         try:
@@ -41,22 +245,28 @@ class StoreManagementController(http.Controller):
             if not name or not list_price:
                 return json.dumps({'status': 'error', 'message': 'Product name and price are required'})
 
-            # Create a new product
+            # Create a new product, or update the one holding the barcode.
+            # Terminals may push the same barcode again, so values they did
+            # not send are left out rather than reset on the existing product.
             product_vals = {
                 'name': name,
                 'list_price': list_price,
-                'type': type,
-                'barcode': barcode,
-                'categ_id': category_id if category_id else False,
                 'available_in_pos': True,
             }
+            if 'type' in request_data:
+                product_vals['type'] = type
+            if barcode:
+                product_vals['barcode'] = barcode
+            if 'category_id' in request_data:
+                product_vals['categ_id'] = category_id if category_id else False
 
-            # Create the product record
-            product = request.env['product.product'].sudo().create(product_vals)
+            Product = request.env['product.template'].sudo()
+            template, created = Product._upsert_by_barcode([product_vals])[0]
+            product = template.product_variant_id
 
             return json.dumps({
                 'status': 'success',
-                'message': 'Product created successfully',
+                'message': 'Product created successfully' if created else 'Product updated successfully',
                 'data': {
                     'product_id': product.id,
                     'name': name,
@@ -66,6 +276,9 @@ class StoreManagementController(http.Controller):
                 },
             })
 
+        except ConcurrencyError:
+            # Retried by Odoo in a new transaction
+            raise
         except Exception as e:
             return json.dumps({
                 'status': 'error',